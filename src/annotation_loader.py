@@ -4,22 +4,183 @@ import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, TextBox, RadioButtons
 from matplotlib.colors import ListedColormap, Normalize
 import json
+import os
+import time
+from collections import namedtuple
 
-def load_annotation(filepath):
-    """Load the NRRD annotation file"""
-    data, header = nrrd.read(filepath)
+try:
+    # orjson parses the large Allen structure tree several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import pyqtgraph as pg
+    from pyqtgraph.Qt import QtCore, QtWidgets
+    PYQTGRAPH_AVAILABLE = True
+except ImportError:
+    PYQTGRAPH_AVAILABLE = False
+
+# Minimum seconds between hover-triggered redraws (~30 Hz)
+HOVER_REDRAW_INTERVAL = 1.0 / 30
+
+# np.rot90(s.T, k) for a raw 2D slice s, written as one strided view:
+# k -> (transpose, flip rows, flip columns)
+SLICE_ORIENTATIONS = {
+    0: (True, False, False),
+    1: (False, True, False),
+    2: (True, True, True),
+    3: (False, False, True),
+}
+
+# Above this structure ID a dense palette LUT costs too much memory
+PALETTE_MAX_ID = 1_000_000
+
+# Structure table sorted by ID: row i of names/acronyms/colors belongs to ids[i]
+StructureTable = namedtuple('StructureTable', ['ids', 'names', 'acronyms', 'colors'])
+
+# NRRD 'type' field -> numpy type code (byte order added from 'endian')
+NRRD_DTYPES = {
+    'signed char': 'i1', 'int8': 'i1', 'int8_t': 'i1',
+    'uchar': 'u1', 'unsigned char': 'u1', 'uint8': 'u1', 'uint8_t': 'u1',
+    'short': 'i2', 'short int': 'i2', 'signed short': 'i2', 'signed short int': 'i2',
+    'int16': 'i2', 'int16_t': 'i2',
+    'ushort': 'u2', 'unsigned short': 'u2', 'unsigned short int': 'u2',
+    'uint16': 'u2', 'uint16_t': 'u2',
+    'int': 'i4', 'signed int': 'i4', 'int32': 'i4', 'int32_t': 'i4',
+    'uint': 'u4', 'unsigned int': 'u4', 'uint32': 'u4', 'uint32_t': 'u4',
+    'longlong': 'i8', 'long long': 'i8', 'long long int': 'i8', 'signed long long': 'i8',
+    'signed long long int': 'i8', 'int64': 'i8', 'int64_t': 'i8',
+    'ulonglong': 'u8', 'unsigned long long': 'u8', 'unsigned long long int': 'u8',
+    'uint64': 'u8', 'uint64_t': 'u8',
+    'float': 'f4', 'double': 'f8',
+}
+
+def _nrrd_dtype(header):
+    """Numpy dtype for an NRRD header, or None if the type is not recognised"""
+    code = NRRD_DTYPES.get(header.get('type'))
+    if code is None:
+        return None
+    if code[1] == '1':
+        return np.dtype(code)
+    order = '>' if header.get('endian', 'little') == 'big' else '<'
+    return np.dtype(order + code)
+
+def load_annotation(filepath, mmap=True):
+    """
+    Load the NRRD annotation file
+    
+    With mmap=True the voxel data is memory-mapped read-only instead of read
+    into RAM. Raw-encoded files are mapped in place; compressed files are
+    decompressed once into a '.raw' sidecar next to the NRRD which is mapped
+    on later runs. Falls back to a full nrrd.read when mapping is not possible.
+    The array has the same (x, y, z) Fortran-order indexing as nrrd.read.
+    """
+    if not mmap:
+        return nrrd.read(filepath)
+    
+    with open(filepath, 'rb') as fh:
+        header = nrrd.read_header(fh)
+        data_offset = fh.tell()
+    
+    shape = tuple(int(n) for n in header['sizes'])
+    dtype = _nrrd_dtype(header)
+    attached = 'data file' not in header and 'datafile' not in header
+    skips = any(int(header.get(key, 0))
+                for key in ('line skip', 'lineskip', 'byte skip', 'byteskip'))
+    
+    if dtype is None or not attached or skips:
+        data, header = nrrd.read(filepath)
+        return data, header
+    
+    if header.get('encoding') == 'raw':
+        data = np.memmap(filepath, dtype=dtype, mode='r', offset=data_offset,
+                         shape=shape, order='F')
+        return data, header
+    
+    # Compressed: decompress once into a sidecar and map that
+    raw_path = os.path.splitext(filepath)[0] + '.raw'
+    n_bytes = int(np.prod(shape)) * dtype.itemsize
+    sidecar_ok = (os.path.exists(raw_path)
+                  and os.path.getsize(raw_path) == n_bytes
+                  and os.path.getmtime(raw_path) >= os.path.getmtime(filepath))
+    
+    if not sidecar_ok:
+        data, header = nrrd.read(filepath)
+        dtype = data.dtype
+        try:
+            # data is Fortran-ordered, so data.T.tofile writes NRRD raw order
+            np.asfortranarray(data).T.tofile(raw_path)
+        except OSError as e:
+            print(f"Warning: could not write raw sidecar {raw_path}: {e}")
+            return data, header
+        del data
+    
+    data = np.memmap(raw_path, dtype=dtype, mode='r', shape=shape, order='F')
     return data, header
 
+def load_annotation_stats(filepath, annotation_data):
+    """
+    Load min/max/unique-count of the annotation volume from a sidecar JSON
+    (e.g. annotation_25.stats.json), computing and caching it on first use
+    """
+    stats_path = os.path.splitext(filepath)[0] + '.stats.json'
+    source_mtime = os.path.getmtime(filepath)
+    
+    if os.path.exists(stats_path):
+        try:
+            with open(stats_path, 'r') as f:
+                stats = json.load(f)
+            if stats.get('source_mtime') == source_mtime:
+                return stats
+        except (OSError, ValueError):
+            pass
+    
+    stats = {
+        'min': int(annotation_data.min()),
+        'max': int(annotation_data.max()),
+        'n_unique': int(np.unique(annotation_data).size),
+        'source_mtime': source_mtime
+    }
+    
+    try:
+        with open(stats_path, 'w') as f:
+            json.dump(stats, f, indent=2)
+    except OSError as e:
+        print(f"Warning: could not cache annotation stats: {e}")
+    
+    return stats
+
 def load_structure_tree(filepath):
     """Load the structure tree JSON file and create ID to name mapping"""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    with open(filepath, 'rb') as f:
+        data = json_loads(f.read())
     
     # Create a mapping from structure ID to structure info
     id_to_info = {}
     
-    def traverse_tree(node):
-        """Recursively traverse the structure tree"""
+    # Handle different JSON structures
+    if isinstance(data, dict):
+        # Check if there's a 'msg' key (common in Allen Institute files)
+        if 'msg' in data:
+            root_nodes = data['msg']
+        else:
+            root_nodes = [data]
+    elif isinstance(data, list):
+        root_nodes = data
+    else:
+        root_nodes = [data]
+    
+    # Walk the tree with an explicit stack (pre-order, same as recursion)
+    stack = list(reversed(root_nodes))
+    while stack:
+        node = stack.pop()
         structure_id = node.get('id')
         name = node.get('name', 'Unknown')
         acronym = node.get('acronym', '')
@@ -32,51 +193,125 @@ def load_structure_tree(filepath):
             }
         
         # Process children
-        if 'children' in node:
-            for child in node['children']:
-                traverse_tree(child)
+        stack.extend(reversed(node.get('children') or ()))
     
-    # Handle different JSON structures
-    if isinstance(data, dict):
-        # Check if there's a 'msg' key (common in Allen Institute files)
-        if 'msg' in data:
-            root_nodes = data['msg']
-        else:
-            root_nodes = [data]
-    elif isinstance(data, list):
-        root_nodes = data
+    return id_to_info
+
+def hex_to_rgb(hex_colors):
+    """Convert a sequence of 'RRGGBB' strings to an (N, 3) uint8 array"""
+    packed = np.fromiter((int(h, 16) for h in hex_colors), dtype=np.uint32,
+                         count=len(hex_colors))
+    rgb = np.empty((len(packed), 3), dtype=np.uint8)
+    rgb[:, 0] = (packed >> 16) & 0xFF
+    rgb[:, 1] = (packed >> 8) & 0xFF
+    rgb[:, 2] = packed & 0xFF
+    return rgb
+
+def build_palette(structure_info, max_id=None):
+    """Build a (max_id+1, 3) uint8 RGB lookup table indexed by structure ID"""
+    if max_id is None:
+        max_id = max(structure_info, default=0)
+    max_id = int(max_id)
+    
+    # Row 0 (background) and IDs missing from the tree stay black
+    palette = np.zeros((max_id + 1, 3), dtype=np.uint8)
+    ids = [k for k in structure_info if 0 < k <= max_id]
+    if ids:
+        palette[ids] = hex_to_rgb([structure_info[k]['color_hex'] for k in ids])
+    
+    return palette
+
+def build_structure_table(structure_info):
+    """Build a StructureTable of parallel per-structure rows sorted by ID"""
+    sorted_ids = sorted(structure_info)
+    ids = np.array(sorted_ids, dtype=np.int64)
+    names = tuple(structure_info[k]['name'] for k in sorted_ids)
+    acronyms = tuple(structure_info[k]['acronym'] for k in sorted_ids)
+    colors = hex_to_rgb([structure_info[k]['color_hex'] for k in sorted_ids])
+    colors[ids == 0] = 0  # Background is always black
+    
+    return StructureTable(ids, names, acronyms, colors)
+
+def find_structure_row(table, structure_id):
+    """Row of structure_id in a StructureTable, or -1 if it is not listed"""
+    row = int(np.searchsorted(table.ids, structure_id))
+    if row < len(table.ids) and table.ids[row] == structure_id:
+        return row
+    return -1
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _fill_rgb_sparse(slice_data, ids, colors, rgb_out):
+        """Per-pixel binary search of structure IDs, parallel over rows"""
+        n_ids = ids.shape[0]
+        for i in prange(slice_data.shape[0]):
+            for j in range(slice_data.shape[1]):
+                v = slice_data[i, j]
+                k = np.searchsorted(ids, v)
+                if k < n_ids and ids[k] == v:
+                    rgb_out[i, j, 0] = colors[k, 0]
+                    rgb_out[i, j, 1] = colors[k, 1]
+                    rgb_out[i, j, 2] = colors[k, 2]
+                else:
+                    rgb_out[i, j, 0] = 0
+                    rgb_out[i, j, 1] = 0
+                    rgb_out[i, j, 2] = 0
+    
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _gather_rgb(slice_data, palette, rgb_out):
+        """Palette gather, parallel over rows; out-of-range IDs -> row 0"""
+        max_row = palette.shape[0] - 1
+        for i in prange(slice_data.shape[0]):
+            for j in range(slice_data.shape[1]):
+                v = slice_data[i, j]
+                if v < 0 or v > max_row:
+                    v = 0
+                rgb_out[i, j, 0] = palette[v, 0]
+                rgb_out[i, j, 1] = palette[v, 1]
+                rgb_out[i, j, 2] = palette[v, 2]
+
+def gather_rgb(slice_data, palette, out):
+    """Write palette[slice_data] into the preallocated (H, W, 3) uint8 array out"""
+    if NUMBA_AVAILABLE:
+        _gather_rgb(slice_data, palette, out)
     else:
-        root_nodes = [data]
+        # mode='clip' lets np.take write straight into out
+        np.take(palette, slice_data, axis=0, out=out, mode='clip')
+    return out
+
+def fill_rgb_sparse(slice_data, ids, colors):
+    """Create RGB image from structure IDs when IDs are too sparse for a LUT"""
+    height, width = slice_data.shape
+    rgb_image = np.zeros((height, width, 3), dtype=np.uint8)
+    if len(ids) == 0:
+        return rgb_image
     
-    # Traverse all root nodes
-    for root in root_nodes:
-        traverse_tree(root)
+    if NUMBA_AVAILABLE:
+        _fill_rgb_sparse(np.ascontiguousarray(slice_data, dtype=np.int64),
+                         ids, colors, rgb_image)
+    else:
+        k = np.minimum(np.searchsorted(ids, slice_data), len(ids) - 1)
+        found = ids[k] == slice_data
+        rgb_image[found] = colors[k[found]]
     
-    return id_to_info
+    return rgb_image
 
-def create_color_mapped_image(slice_data, structure_info):
+def create_color_mapped_image(slice_data, structure_info, palette=None):
     """Create RGB image from structure IDs using their defined colors"""
-    # Create RGB image
-    height, width = slice_data.shape
-    rgb_image = np.zeros((height, width, 3), dtype=np.uint8)
+    if palette is None:
+        if max(structure_info, default=0) > PALETTE_MAX_ID:
+            table = build_structure_table(structure_info)
+            return fill_rgb_sparse(slice_data, table.ids, table.colors)
+        palette = build_palette(structure_info)
+    max_id = palette.shape[0] - 1
     
-    for i in range(height):
-        for j in range(width):
-            struct_id = int(slice_data[i, j])
-            if struct_id in structure_info and struct_id != 0:
-                hex_color = structure_info[struct_id]['color_hex']
-                # Convert hex to RGB
-                r = int(hex_color[0:2], 16)
-                g = int(hex_color[2:4], 16)
-                b = int(hex_color[4:6], 16)
-                rgb_image[i, j] = [r, g, b]
-            else:
-                # Black for background or unknown
-                rgb_image[i, j] = [0, 0, 0]
+    # IDs outside the palette are unknown structures -> background row
+    idx = np.where((slice_data >= 0) & (slice_data <= max_id), slice_data, 0)
+    rgb_image = palette[idx.astype(np.intp, copy=False)]
     
     return rgb_image
 
-def interactive_viewer_advanced(annotation_data, structure_info):
+def interactive_viewer_advanced(annotation_data, structure_info, data_range=None):
     """
     Advanced interactive viewer with:
     - Slice navigation (slider + mouse wheel)
@@ -87,6 +322,9 @@ def interactive_viewer_advanced(annotation_data, structure_info):
     - Zoom and Pan
     - Structure name display
     - Color mode selection (ID vs Structure colors)
+    
+    data_range : (min, max) of structure IDs, optional. Scanned from the
+    volume if not given.
     """
     # Create figure and axis
     fig = plt.figure(figsize=(16, 10))
@@ -139,11 +377,46 @@ def interactive_viewer_advanced(annotation_data, structure_info):
     color_mode = ['by_id']  # 'by_id' or 'by_structure'
     
     # Get initial min/max values
-    data_min = float(np.min(annotation_data))
-    data_max = float(np.max(annotation_data))
+    if data_range is None:
+        data_range = (np.min(annotation_data), np.max(annotation_data))
+    data_min = float(data_range[0])
+    data_max = float(data_range[1])
+    
+    # Structure names/colors never change, so build the lookup tables once.
+    # Very large IDs (e.g. CCFv3 annotations) color from the sorted table instead.
+    table = build_structure_table(structure_info)
+    palette = build_palette(structure_info, int(data_max)) if data_max <= PALETTE_MAX_ID else None
+    
+    def lookup_structure(structure_id):
+        """Return (name, acronym) for a structure ID, or None if unknown"""
+        row = find_structure_row(table, structure_id)
+        if row < 0:
+            return None
+        return table.names[row], table.acronyms[row]
     
     axis_names = ['Coronal', 'Sagittal', 'Axial']
     
+    # Last extracted slice; annotation_data is read-only here so no invalidation
+    slice_cache = {'key': None, 'data': None}
+    
+    # Reusable RGB buffers for structure coloring, keyed by (axis, shape)
+    rgb_buffers = {}
+    
+    display_step = [1]  # Decimation stride of the displayed image
+    current_shape = [None]  # Full-resolution shape of the displayed slice
+    current_slice = [None]  # Full-resolution slice on screen (for hover lookups)
+    last_hover = [None]  # (x, y, structure_id) last shown in the info panel
+    last_hover_draw = [0.0]  # time.monotonic() of the last hover redraw
+    
+    def flush_hover():
+        """Trailing redraw for hover text set inside the throttle window"""
+        last_hover_draw[0] = time.monotonic()
+        fig.canvas.draw_idle()
+    
+    hover_timer = fig.canvas.new_timer(interval=int(HOVER_REDRAW_INTERVAL * 1000))
+    hover_timer.single_shot = True
+    hover_timer.add_callback(flush_hover)
+    
     # Create function to get slice data
     def get_slice_data(slice_idx=None, axis=None, rotation=None):
         """Get current slice data based on axis and rotation"""
@@ -156,22 +429,34 @@ def interactive_viewer_advanced(annotation_data, structure_info):
         
         slice_idx = int(slice_idx)
         
+        key = (axis, slice_idx, rotation)
+        if key == slice_cache['key']:
+            return slice_cache['data']
+        
         if axis == 0:
-            slice_data = annotation_data[slice_idx, :, :].T
+            slice_data = annotation_data[slice_idx, :, :]
         elif axis == 1:
-            slice_data = annotation_data[:, slice_idx, :].T
+            slice_data = annotation_data[:, slice_idx, :]
         else:
-            slice_data = annotation_data[:, :, slice_idx].T
+            slice_data = annotation_data[:, :, slice_idx]
+        
+        # Transpose + rotation as a single view, then one contiguous copy so
+        # the coloring gather and hover reads walk memory in order
+        transpose, flip_rows, flip_cols = SLICE_ORIENTATIONS[(rotation // 90) % 4]
+        if transpose:
+            slice_data = slice_data.T
+        slice_data = slice_data[::-1 if flip_rows else 1, ::-1 if flip_cols else 1]
+        slice_data = np.ascontiguousarray(slice_data)
         
-        # Apply rotation
-        k = rotation // 90  # Number of 90-degree rotations
-        if k != 0:
-            slice_data = np.rot90(slice_data, k)
+        slice_cache['key'] = key
+        slice_cache['data'] = slice_data
         
         return slice_data
     
     # Create initial image
     initial_slice = get_slice_data()
+    current_shape[0] = initial_slice.shape
+    current_slice[0] = initial_slice
     
     # Display image (initially by ID)
     img = ax_img.imshow(initial_slice, cmap='nipy_spectral', origin='lower', 
@@ -223,14 +508,40 @@ def interactive_viewer_advanced(annotation_data, structure_info):
                            fontsize=9, verticalalignment='top',
                            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.9))
     
+    def get_display_step(slice_shape):
+        """Stride that shrinks the slice to roughly the axes' screen size"""
+        if zoom_level[0] > 1.0 + 1e-6:
+            return 1
+        bbox = ax_img.get_window_extent()
+        px_h = max(1, int(bbox.height))
+        px_w = max(1, int(bbox.width))
+        return max(1, min(slice_shape[0] // px_h, slice_shape[1] // px_w))
+    
     def update_image():
         """Update the displayed image"""
         current_slice_idx[0] = int(slider_slice.val)
         slice_data = get_slice_data()
         
+        # At full view the screen can't show more pixels than the axes has,
+        # so decimate before coloring; extent below stays in slice coordinates
+        display_step[0] = get_display_step(slice_data.shape)
+        full_shape = slice_data.shape
+        current_shape[0] = full_shape
+        current_slice[0] = slice_data
+        slice_data = slice_data[::display_step[0], ::display_step[0]]
+        
         if color_mode[0] == 'by_structure':
             # Create RGB image using structure colors
-            rgb_image = create_color_mapped_image(slice_data, structure_info)
+            if palette is not None:
+                # The palette spans every ID in the volume (<= data_max)
+                buf_key = (current_axis[0], slice_data.shape)
+                rgb_image = rgb_buffers.get(buf_key)
+                if rgb_image is None:
+                    rgb_image = np.empty(slice_data.shape + (3,), dtype=np.uint8)
+                    rgb_buffers[buf_key] = rgb_image
+                gather_rgb(slice_data, palette, rgb_image)
+            else:
+                rgb_image = fill_rgb_sparse(slice_data, table.ids, table.colors)
             img.set_data(rgb_image)
             img.set_cmap(None)  # Remove colormap for RGB
             img.set_clim(None, None)
@@ -262,11 +573,18 @@ def interactive_viewer_advanced(annotation_data, structure_info):
             btn_apply.ax.set_visible(True)
             btn_reset.ax.set_visible(True)
         
-        img.set_extent([0, slice_data.shape[1], 0, slice_data.shape[0]])
+        img.set_extent([0, full_shape[1], 0, full_shape[0]])
         ax_img.set_title(f'{axis_names[current_axis[0]]} Slice {current_slice_idx[0]} (Rotation: {rotation_angle[0]}°) - {title_suffix}', 
                          fontsize=14, fontweight='bold')
         fig.canvas.draw_idle()
     
+    def redraw_for_zoom():
+        """Re-render if the zoom level changes the display stride, else just redraw"""
+        if get_display_step(current_shape[0]) != display_step[0]:
+            update_image()
+        else:
+            fig.canvas.draw_idle()
+    
     def update_slice(val):
         """Update the displayed slice"""
         update_image()
@@ -362,51 +680,35 @@ def interactive_viewer_advanced(annotation_data, structure_info):
         rotation_angle[0] = (rotation_angle[0] + 90) % 360
         update_image()
     
-    def zoom_in(event):
-        """Zoom in by reducing view limits"""
-        zoom_level[0] *= 1.3
-        xlim = ax_img.get_xlim()
-        ylim = ax_img.get_ylim()
+    def zoom_by(factor):
+        """Scale the view limits about their center by 1/factor"""
+        zoom_level[0] *= factor
+        (x0, x1), (y0, y1) = ax_img.get_xlim(), ax_img.get_ylim()
         
-        x_center = (xlim[0] + xlim[1]) / 2
-        y_center = (ylim[0] + ylim[1]) / 2
-        x_range = (xlim[1] - xlim[0]) / 1.3
-        y_range = (ylim[1] - ylim[0]) / 1.3
+        x_center = (x0 + x1) / 2
+        y_center = (y0 + y1) / 2
+        x_half = (x1 - x0) / factor / 2
+        y_half = (y1 - y0) / factor / 2
         
-        ax_img.set_xlim(x_center - x_range/2, x_center + x_range/2)
-        ax_img.set_ylim(y_center - y_range/2, y_center + y_range/2)
-        fig.canvas.draw_idle()
+        # Don't zoom out beyond initial limits
+        max_y, max_x = current_shape[0]
+        ax_img.set(xlim=(max(0, x_center - x_half), min(max_x, x_center + x_half)),
+                   ylim=(max(0, y_center - y_half), min(max_y, y_center + y_half)))
+        redraw_for_zoom()
+    
+    def zoom_in(event):
+        """Zoom in by reducing view limits"""
+        zoom_by(1.3)
     
     def zoom_out(event):
         """Zoom out by expanding view limits"""
-        zoom_level[0] /= 1.3
-        xlim = ax_img.get_xlim()
-        ylim = ax_img.get_ylim()
-        
-        x_center = (xlim[0] + xlim[1]) / 2
-        y_center = (ylim[0] + ylim[1]) / 2
-        x_range = (xlim[1] - xlim[0]) * 1.3
-        y_range = (ylim[1] - ylim[0]) * 1.3
-        
-        # Don't zoom out beyond initial limits
-        slice_data = get_slice_data()
-        max_x = slice_data.shape[1]
-        max_y = slice_data.shape[0]
-        
-        new_xlim = [max(0, x_center - x_range/2), min(max_x, x_center + x_range/2)]
-        new_ylim = [max(0, y_center - y_range/2), min(max_y, y_center + y_range/2)]
-        
-        ax_img.set_xlim(new_xlim)
-        ax_img.set_ylim(new_ylim)
-        fig.canvas.draw_idle()
+        zoom_by(1 / 1.3)
     
     def reset_view(event):
         """Reset zoom and pan to original view"""
         zoom_level[0] = 1.0
-        slice_data = get_slice_data()
-        ax_img.set_xlim(0, slice_data.shape[1])
-        ax_img.set_ylim(0, slice_data.shape[0])
-        fig.canvas.draw_idle()
+        ax_img.set(xlim=(0, current_shape[0][1]), ylim=(0, current_shape[0][0]))
+        redraw_for_zoom()
     
     def switch_axis(new_axis):
         """Switch viewing axis"""
@@ -432,18 +734,22 @@ def interactive_viewer_advanced(annotation_data, structure_info):
     def on_mouse_move(event):
         """Display structure ID and name under cursor"""
         if event.inaxes == ax_img and event.xdata is not None and event.ydata is not None:
-            # Get current slice data to determine dimensions
-            slice_data = get_slice_data()
+            # Index the slice already on screen rather than re-extracting it
+            slice_data = current_slice[0]
             x, y = int(event.xdata), int(event.ydata)
             
             if 0 <= x < slice_data.shape[1] and 0 <= y < slice_data.shape[0]:
                 structure_id = int(slice_data[y, x])
                 
+                # Motion within the same pixel changes nothing on screen
+                if last_hover[0] == (x, y, structure_id):
+                    return
+                last_hover[0] = (x, y, structure_id)
+                
                 # Get structure information
-                if structure_id in structure_info:
-                    info = structure_info[structure_id]
-                    name = info['name']
-                    acronym = info['acronym']
+                structure = lookup_structure(structure_id)
+                if structure is not None:
+                    name, acronym = structure
                     
                     # Update small overlay text
                     text_info.set_text(f'Pos: ({x}, {y})\nID: {structure_id}\n{acronym}')
@@ -459,7 +765,16 @@ def interactive_viewer_advanced(annotation_data, structure_info):
                     text_info.set_text(f'Pos: ({x}, {y})\nID: {structure_id}\n(Unknown)')
                     info_text.set_text(f"Structure ID: {structure_id}\n\nName: Unknown\n\nPosition: ({x}, {y})")
                 
-                fig.canvas.draw_idle()
+                # Coalesce bursts of motion events into at most ~30 redraws/s;
+                # throttled updates are drawn by the hover timer once the
+                # window has passed, so the panel never shows a stale position
+                now = time.monotonic()
+                hover_timer.stop()
+                if now - last_hover_draw[0] >= HOVER_REDRAW_INTERVAL:
+                    last_hover_draw[0] = now
+                    fig.canvas.draw_idle()
+                else:
+                    hover_timer.start()
     
     # Connect callbacks
     slider_slice.on_changed(update_slice)
@@ -483,6 +798,172 @@ def interactive_viewer_advanced(annotation_data, structure_info):
     
     plt.show()
 
+def interactive_viewer_pyqtgraph(annotation_data, structure_info, data_range=None):
+    """
+    Interactive viewer drawn with pyqtgraph (OpenGL-friendly Qt canvas):
+    - Slice navigation (slider)
+    - Axis switching and rotation
+    - Zoom and Pan (mouse wheel / drag on the image)
+    - Structure name display on hover
+    - Color mode selection (ID vs Structure colors), applied as an image LUT
+    
+    data_range : (min, max) of structure IDs, optional. Scanned from the
+    volume if not given.
+    """
+    if not PYQTGRAPH_AVAILABLE:
+        raise ImportError("pyqtgraph is not installed. Install with: pip install pyqtgraph")
+    
+    if data_range is None:
+        data_range = (np.min(annotation_data), np.max(annotation_data))
+    data_min = float(data_range[0])
+    data_max = float(data_range[1])
+    
+    # Structure names/colors never change, so build the lookup tables once
+    table = build_structure_table(structure_info)
+    palette = build_palette(structure_info, int(data_max)) if data_max <= PALETTE_MAX_ID else None
+    id_lut = pg.colormap.get('nipy_spectral', source='matplotlib').getLookupTable(nPts=256)
+    
+    current_axis = [0]  # 0=coronal, 1=sagittal, 2=axial
+    rotation_angle = [0]  # Current rotation angle in degrees
+    color_mode = ['by_id']  # 'by_id' or 'by_structure'
+    current_slice = [None]  # Slice currently on screen (for hover lookups)
+    axis_names = ['Coronal', 'Sagittal', 'Axial']
+    
+    def get_slice_data():
+        """Get current slice data based on axis and rotation"""
+        slice_idx = slider.value()
+        if current_axis[0] == 0:
+            slice_data = annotation_data[slice_idx, :, :]
+        elif current_axis[0] == 1:
+            slice_data = annotation_data[:, slice_idx, :]
+        else:
+            slice_data = annotation_data[:, :, slice_idx]
+        
+        transpose, flip_rows, flip_cols = SLICE_ORIENTATIONS[(rotation_angle[0] // 90) % 4]
+        if transpose:
+            slice_data = slice_data.T
+        slice_data = slice_data[::-1 if flip_rows else 1, ::-1 if flip_cols else 1]
+        return np.ascontiguousarray(slice_data)
+    
+    # Build window: image on the left, controls on the right
+    app = pg.mkQApp("CCF Annotation Viewer")
+    win = QtWidgets.QWidget()
+    win.setWindowTitle("CCF Annotation Viewer")
+    win.resize(1400, 900)
+    layout = QtWidgets.QHBoxLayout(win)
+    
+    graphics = pg.GraphicsLayoutWidget()
+    view = graphics.addViewBox()
+    view.setAspectLocked(True)
+    img_item = pg.ImageItem(axisOrder='row-major')
+    view.addItem(img_item)
+    layout.addWidget(graphics, stretch=4)
+    
+    panel = QtWidgets.QVBoxLayout()
+    layout.addLayout(panel, stretch=1)
+    
+    title_label = QtWidgets.QLabel()
+    panel.addWidget(title_label)
+    
+    slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+    panel.addWidget(slider)
+    
+    mode_box = QtWidgets.QComboBox()
+    mode_box.addItems(['Color by ID', 'Color by Structure'])
+    panel.addWidget(mode_box)
+    
+    axis_buttons = [QtWidgets.QPushButton(name) for name in axis_names]
+    for btn in axis_buttons:
+        panel.addWidget(btn)
+    btn_rot_ccw = QtWidgets.QPushButton('↺ 90°')
+    btn_rot_cw = QtWidgets.QPushButton('↻ 90°')
+    btn_reset_view = QtWidgets.QPushButton('Reset View')
+    for btn in (btn_rot_ccw, btn_rot_cw, btn_reset_view):
+        panel.addWidget(btn)
+    
+    info_label = QtWidgets.QLabel('Hover over image\nfor structure info')
+    info_label.setWordWrap(True)
+    info_label.setStyleSheet("font-family: monospace;")
+    panel.addWidget(info_label)
+    panel.addStretch()
+    
+    def update_image():
+        """Update the displayed image"""
+        slice_data = get_slice_data()
+        current_slice[0] = slice_data
+        
+        if color_mode[0] == 'by_structure':
+            if palette is not None:
+                # Palette rows line up with IDs when levels span the LUT length
+                img_item.setImage(slice_data, autoLevels=False,
+                                  lut=palette, levels=(0, len(palette)))
+            else:
+                img_item.setImage(fill_rgb_sparse(slice_data, table.ids, table.colors),
+                                  autoLevels=False, lut=None, levels=(0, 255))
+            title_suffix = "Color by Structure"
+        else:
+            img_item.setImage(slice_data, autoLevels=False,
+                              lut=id_lut, levels=(data_min, data_max))
+            title_suffix = "Color by ID"
+        
+        title_label.setText(f'{axis_names[current_axis[0]]} Slice {slider.value()} '
+                            f'(Rotation: {rotation_angle[0]}°) - {title_suffix}')
+    
+    def switch_axis(new_axis):
+        """Switch viewing axis"""
+        current_axis[0] = new_axis
+        rotation_angle[0] = 0  # Reset rotation when switching axis
+        slider.blockSignals(True)
+        slider.setRange(0, annotation_data.shape[new_axis] - 1)
+        slider.setValue(annotation_data.shape[new_axis] // 2)
+        slider.blockSignals(False)
+        update_image()
+        view.autoRange()
+    
+    def rotate(delta):
+        """Rotate by delta degrees (multiple of 90)"""
+        rotation_angle[0] = (rotation_angle[0] + delta) % 360
+        update_image()
+        view.autoRange()
+    
+    def change_color_mode(index):
+        """Change between ID and structure color modes"""
+        color_mode[0] = 'by_id' if index == 0 else 'by_structure'
+        update_image()
+    
+    def on_mouse_move(scene_pos):
+        """Display structure ID and name under cursor"""
+        slice_data = current_slice[0]
+        if slice_data is None or not view.sceneBoundingRect().contains(scene_pos):
+            return
+        pos = view.mapSceneToView(scene_pos)
+        x, y = int(pos.x()), int(pos.y())
+        if not (0 <= x < slice_data.shape[1] and 0 <= y < slice_data.shape[0]):
+            return
+        
+        structure_id = int(slice_data[y, x])
+        row = find_structure_row(table, structure_id)
+        
+        if row >= 0:
+            info_label.setText(f"Structure ID: {structure_id}\n\nAcronym: {table.acronyms[row]}\n\n"
+                               f"Name:\n{table.names[row]}\n\nPosition: ({x}, {y})")
+        else:
+            info_label.setText(f"Structure ID: {structure_id}\n\nName: Unknown\n\nPosition: ({x}, {y})")
+    
+    # Connect callbacks
+    slider.valueChanged.connect(lambda val: update_image())
+    mode_box.currentIndexChanged.connect(change_color_mode)
+    for axis, btn in enumerate(axis_buttons):
+        btn.clicked.connect(lambda checked=False, axis=axis: switch_axis(axis))
+    btn_rot_ccw.clicked.connect(lambda: rotate(-90))
+    btn_rot_cw.clicked.connect(lambda: rotate(90))
+    btn_reset_view.clicked.connect(lambda: view.autoRange())
+    graphics.scene().sigMouseMoved.connect(on_mouse_move)
+    
+    switch_axis(0)
+    win.show()
+    app.exec()
+
 # Main execution
 if __name__ == "__main__":
     # Define file paths
@@ -492,10 +973,12 @@ if __name__ == "__main__":
     print("Loading annotation file...")
     annotation_data, header = load_annotation(annotation_filepath)
     
+    stats = load_annotation_stats(annotation_filepath, annotation_data)
+    
     print(f"Annotation shape: {annotation_data.shape}")
-    print(f"Unique structure IDs: {len(np.unique(annotation_data))}")
+    print(f"Unique structure IDs: {stats['n_unique']}")
     print(f"Data type: {annotation_data.dtype}")
-    print(f"Min ID: {np.min(annotation_data)}, Max ID: {np.max(annotation_data)}")
+    print(f"Min ID: {stats['min']}, Max ID: {stats['max']}")
     
     print("\nLoading structure tree...")
     structure_info = load_structure_tree(structure_tree_filepath)
@@ -507,15 +990,25 @@ if __name__ == "__main__":
         for i, (struct_id, info) in enumerate(list(structure_info.items())[:5]):
             print(f"  ID {struct_id}: {info['acronym']} - {info['name']} (Color: #{info['color_hex']})")
     
-    print("\nLaunching interactive viewer...")
-    print("- Use radio buttons to switch between 'Color by ID' and 'Color by Structure'")
-    print("- Use 'Slice' slider to navigate through slices")
-    print("- Scroll mouse wheel over image to move through slices (up=next, down=previous)")
-    print("- In 'Color by ID' mode: Use sliders/text boxes to adjust color range")
-    print("- In 'Color by Structure' mode: Each region shows its anatomical color")
-    print("- Click '↺ 90°' or '↻ 90°' to rotate the view")
-    print("- Click 'Zoom +' or 'Zoom -' to zoom in/out")
-    print("- Click 'Reset View' to reset zoom and rotation")
-    print("- Hover mouse over image to see structure name and ID")
-    
-    interactive_viewer_advanced(annotation_data, structure_info)
\ No newline at end of file
+    if PYQTGRAPH_AVAILABLE:
+        print("\nLaunching pyqtgraph viewer...")
+        print("- Use the slider to navigate through slices")
+        print("- Use the drop-down to switch between 'Color by ID' and 'Color by Structure'")
+        print("- Mouse wheel / drag over the image to zoom and pan")
+        print("- Hover mouse over image to see structure name and ID")
+        interactive_viewer_pyqtgraph(annotation_data, structure_info,
+                                     data_range=(stats['min'], stats['max']))
+    else:
+        print("\nLaunching interactive viewer...")
+        print("- Use radio buttons to switch between 'Color by ID' and 'Color by Structure'")
+        print("- Use 'Slice' slider to navigate through slices")
+        print("- Scroll mouse wheel over image to move through slices (up=next, down=previous)")
+        print("- In 'Color by ID' mode: Use sliders/text boxes to adjust color range")
+        print("- In 'Color by Structure' mode: Each region shows its anatomical color")
+        print("- Click '↺ 90°' or '↻ 90°' to rotate the view")
+        print("- Click 'Zoom +' or 'Zoom -' to zoom in/out")
+        print("- Click 'Reset View' to reset zoom and rotation")
+        print("- Hover mouse over image to see structure name and ID")
+        
+        interactive_viewer_advanced(annotation_data, structure_info,
+                                    data_range=(stats['min'], stats['max']))
@@ -27,7 +27,23 @@ class DataLoader:
         self.data_path = self.project_path / "data"
         self.microct_image = None
         self.atlas = None
-        self.atlas_image = None
+        self._atlas_image = None
+    
+    @property
+    def atlas_image(self):
+        """
+        Atlas reference volume, loaded on first access
+        
+        Memory-maps the atlas' reference.tiff when possible so only the
+        slices that are actually used get read from disk.
+        """
+        if self._atlas_image is None and self.atlas is not None:
+            reference_path = Path(self.atlas.root_dir) / "reference.tiff"
+            try:
+                self._atlas_image = tifffile.memmap(str(reference_path), mode='r')
+            except (OSError, ValueError):
+                self._atlas_image = self.atlas.reference
+        return self._atlas_image
         
     def load_microct(self, filename=None):
         """
@@ -56,13 +72,23 @@ class DataLoader:
             raise FileNotFoundError(f"File not found: {filepath}")
         
         print(f"Loading microCT image: {filepath}")
-        self.microct_image = tifffile.imread(str(filepath))
+        # Memory-map so only the slices that are used get paged in;
+        # compressed/tiled TIFFs can't be mapped and are read fully
+        try:
+            self.microct_image = tifffile.memmap(str(filepath), mode='r')
+            memmapped = True
+        except ValueError:
+            self.microct_image = tifffile.imread(str(filepath))
+            memmapped = False
         
         print(f"✓ MicroCT image loaded successfully")
         print(f"  Shape: {self.microct_image.shape}")
         print(f"  Data type: {self.microct_image.dtype}")
-        print(f"  Intensity range: [{self.microct_image.min()}, {self.microct_image.max()}]")
-        print(f"  Memory size: {self.microct_image.nbytes / 1024**2:.2f} MB")
+        if memmapped:
+            print(f"  Virtual size: {self.microct_image.nbytes / 1024**2:.2f} MB (memory-mapped)")
+        else:
+            print(f"  Intensity range: [{self.microct_image.min()}, {self.microct_image.max()}]")
+            print(f"  Memory size: {self.microct_image.nbytes / 1024**2:.2f} MB")
         
         return self.microct_image
     
@@ -83,15 +109,13 @@ class DataLoader:
         print("(This may take a few minutes on first run)")
         
         self.atlas = BrainGlobeAtlas("allen_mouse_" + str(resolution) + "um")
-        self.atlas_image = self.atlas.reference
+        self._atlas_image = None  # Reference volume is loaded on first use
         
         print(f"✓ Allen CCF atlas loaded successfully")
         print(f"  Atlas name: {self.atlas.atlas_name}")
         print(f"  Resolution: {self.atlas.resolution} μm")
-        print(f"  Shape: {self.atlas_image.shape}")
+        print(f"  Shape: {tuple(self.atlas.metadata['shape'])}")
         print(f"  Orientation: {self.atlas.orientation}")
-        print(f"  Data type: {self.atlas_image.dtype}")
-        print(f"  Intensity range: [{self.atlas_image.min()}, {self.atlas_image.max()}]")
         
         return self.atlas
     
@@ -148,31 +172,20 @@ class DataLoader:
         fig, axes = plt.subplots(2, 3, figsize=(15, 10))
         fig.suptitle('MicroCT vs Allen CCF - Slice Visualization', fontsize=16, fontweight='bold')
         
-        # MicroCT slices
-        axes[0, 0].imshow(self.microct_image[microct_idx, :, :], cmap='gray')
-        axes[0, 0].set_title(f'MicroCT - Coronal (slice {microct_idx}/{self.microct_image.shape[0]})')
-        axes[0, 0].axis('off')
-        
-        axes[0, 1].imshow(self.microct_image[:, self.microct_image.shape[1]//2, :], cmap='gray')
-        axes[0, 1].set_title(f'MicroCT - Sagittal')
-        axes[0, 1].axis('off')
-        
-        axes[0, 2].imshow(self.microct_image[:, :, self.microct_image.shape[2]//2], cmap='gray')
-        axes[0, 2].set_title(f'MicroCT - Axial')
-        axes[0, 2].axis('off')
-        
-        # Atlas slices
-        axes[1, 0].imshow(self.atlas_image[atlas_idx, :, :], cmap='gray')
-        axes[1, 0].set_title(f'Allen CCF - Coronal (slice {atlas_idx}/{self.atlas_image.shape[0]})')
-        axes[1, 0].axis('off')
-        
-        axes[1, 1].imshow(self.atlas_image[:, self.atlas_image.shape[1]//2, :], cmap='gray')
-        axes[1, 1].set_title(f'Allen CCF - Sagittal')
-        axes[1, 1].axis('off')
-        
-        axes[1, 2].imshow(self.atlas_image[:, :, self.atlas_image.shape[2]//2], cmap='gray')
-        axes[1, 2].set_title(f'Allen CCF - Axial')
-        axes[1, 2].axis('off')
+        # Row 0: MicroCT, row 1: Allen CCF; columns are coronal/sagittal/axial
+        rows = [('MicroCT', self.microct_image, microct_idx),
+                ('Allen CCF', self.atlas_image, atlas_idx)]
+        for row, (label, volume, coronal_idx) in enumerate(rows):
+            planes = [
+                (volume[coronal_idx, :, :], f'Coronal (slice {coronal_idx}/{volume.shape[0]})'),
+                (volume[:, volume.shape[1]//2, :], 'Sagittal'),
+                (volume[:, :, volume.shape[2]//2], 'Axial'),
+            ]
+            for col, (plane, view_name) in enumerate(planes):
+                # Nearest-neighbour skips matplotlib's anti-aliased resampling
+                axes[row, col].imshow(plane, cmap='gray', interpolation='nearest')
+                axes[row, col].set_title(f'{label} - {view_name}')
+                axes[row, col].axis('off')
         
         plt.tight_layout()
         
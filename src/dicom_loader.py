@@ -5,13 +5,131 @@ Loads a series of DICOM files from a folder and converts to 3D numpy array
 
 import numpy as np
 import pydicom
+import os
+import re
+import mmap
+from itertools import chain
+from collections import Counter, deque
 from pathlib import Path
 from typing import Tuple, Optional
-import glob
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
+try:
+    import imagecodecs  # noqa: F401  (provides tifffile's zstd codec)
+    IMAGECODECS_AVAILABLE = True
+except ImportError:
+    IMAGECODECS_AVAILABLE = False
 
-def load_dicom_volume(dicom_folder: str, normalize: bool = True) -> Tuple[np.ndarray, dict]:
+
+# Elements needed to decode PixelData; per-slice reads parse only these and
+# skip every other tag (sequences, private tags) in the file
+PIXEL_TAGS = [
+    'PixelData', 'Rows', 'Columns', 'SamplesPerPixel', 'BitsAllocated',
+    'BitsStored', 'HighBit', 'PixelRepresentation', 'PhotometricInterpretation',
+    'PlanarConfiguration', 'NumberOfFrames',
+]
+
+
+# Number of files handed to the kernel for readahead at a time
+READAHEAD_BATCH = 128
+
+
+def _readahead(paths: list):
+    """Ask the kernel to start reading files into the page cache (no-op where unsupported)"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+# In-memory volumes at least this large are backed by transparent huge pages
+HUGEPAGE_MIN_BYTES = 256 * 1024**2
+
+
+def _empty_volume(shape: tuple, dtype) -> np.ndarray:
+    """np.empty, backed by transparent huge pages for large volumes where supported"""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    if nbytes < HUGEPAGE_MIN_BYTES or not hasattr(mmap, 'MADV_HUGEPAGE'):
+        return np.empty(shape, dtype=dtype)
+    try:
+        buffer = mmap.mmap(-1, nbytes, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+        buffer.madvise(mmap.MADV_HUGEPAGE)
+    except OSError:
+        return np.empty(shape, dtype=dtype)
+    # The array keeps the mapping alive through its buffer reference
+    return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+
+def _bounded_map(executor, fn, items, max_pending: int):
+    """Like executor.map, but with at most max_pending results held at a time"""
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _natural_sort_key(name: str) -> list:
+    """Sort key ordering embedded numbers numerically (slice2 before slice10)"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def _read_slice_geometry(dcm_file: str) -> tuple:
+    """Read (Rows, Columns, BitsAllocated) from a DICOM header, skipping pixel data"""
+    ds = pydicom.dcmread(dcm_file, stop_before_pixels=True,
+                         specific_tags=['Rows', 'Columns', 'BitsAllocated'])
+    return (getattr(ds, 'Rows', None), getattr(ds, 'Columns', None),
+            getattr(ds, 'BitsAllocated', None))
+
+
+def _raw_pixels(ds) -> Optional[np.ndarray]:
+    """
+    View uncompressed little-endian single-frame pixel data directly.
+    
+    Returns None when the slice needs pydicom's pixel handlers instead.
+    """
+    syntax = getattr(getattr(ds, 'file_meta', None), 'TransferSyntaxUID', None)
+    if syntax is None or not syntax.is_little_endian or syntax.is_compressed:
+        return None
+    if getattr(ds, 'SamplesPerPixel', 1) != 1 or int(getattr(ds, 'NumberOfFrames', 1) or 1) != 1:
+        return None
+    bits = ds.BitsAllocated
+    if bits not in (8, 16, 32) or ds.BitsStored != bits:
+        return None
+    dtype = np.dtype(f"<{'i' if ds.PixelRepresentation else 'u'}{bits // 8}")
+    return np.frombuffer(ds.PixelData, dtype=dtype, count=ds.Rows * ds.Columns).reshape(ds.Rows, ds.Columns)
+
+
+def _read_slice_pixels(dcm_file: str) -> np.ndarray:
+    """Read one DICOM file and decode its pixel data (runs in worker threads)"""
+    try:
+        ds = pydicom.dcmread(dcm_file, specific_tags=PIXEL_TAGS)
+        pixels = _raw_pixels(ds)
+        if pixels is None:
+            pixels = ds.pixel_array
+    except AttributeError:
+        # The decoder needed an element outside PIXEL_TAGS; parse it fully
+        ds = pydicom.dcmread(dcm_file)
+        pixels = ds.pixel_array
+    # Drop the parsed elements now instead of whenever the garbage collector
+    # reaches the Dataset; only the pixel array is handed back
+    ds.clear()
+    return pixels
+
+
+def load_dicom_volume(dicom_folder: str, normalize: bool = True,
+                      out: Optional[str] = None) -> Tuple[np.ndarray, dict]:
     """
     Load DICOM series from a folder into a 3D volume.
     
@@ -20,12 +138,16 @@ def load_dicom_volume(dicom_folder: str, normalize: bool = True) -> Tuple[np.nda
     dicom_folder : str
         Path to folder containing DICOM (.dcm) files
     normalize : bool
-        If True, normalize volume to [0, 1] range
+        If True, normalize volume to [0, 1] range (as float32)
+    out : str, optional
+        If given, back the volume with a memory-mapped file at this path so
+        volumes larger than RAM can be loaded
         
     Returns:
     --------
     volume : np.ndarray
-        3D array of shape (height, width, slices)
+        3D array of shape (slices, height, width); float in [0, 1] when
+        normalized, otherwise the native DICOM pixel dtype
     metadata : dict
         Dictionary containing DICOM metadata
     """
@@ -35,60 +157,133 @@ def load_dicom_volume(dicom_folder: str, normalize: bool = True) -> Tuple[np.nda
     if not dicom_folder.exists():
         raise FileNotFoundError(f"Directory not found: {dicom_folder}")
     
-    # Find all DICOM files
-    dcm_files = sorted(glob.glob(str(dicom_folder / "*.dcm")))
+    # Find all DICOM files in one directory pass, in slice-number order
+    with os.scandir(dicom_folder) as entries:
+        dcm_files = [entry.path for entry in entries
+                     if entry.name.lower().endswith('.dcm') and entry.is_file()]
+    dcm_files.sort(key=lambda path: _natural_sort_key(os.path.basename(path)))
     
     if len(dcm_files) == 0:
         raise ValueError(f"No DICOM files found in {dicom_folder}")
     
     print(f"Loading {len(dcm_files)} DICOM files from: {dicom_folder}")
     
-    # Read first file to get dimensions
-    first_slice = pydicom.dcmread(dcm_files[0])
-    img_shape = first_slice.pixel_array.shape
+    # Header-only read of the first file for metadata; its pixel data is
+    # decoded once, in the pool, along with every other slice
+    first_slice = pydicom.dcmread(dcm_files[0], stop_before_pixels=True)
+    metadata = {
+        'PixelSpacing': getattr(first_slice, 'PixelSpacing', None),
+        'SliceThickness': getattr(first_slice, 'SliceThickness', None),
+        'ImageOrientationPatient': getattr(first_slice, 'ImageOrientationPatient', None),
+        'ImagePositionPatient': getattr(first_slice, 'ImagePositionPatient', None),
+        'Rows': first_slice.Rows,
+        'Columns': first_slice.Columns,
+        'NumberOfSlices': len(dcm_files)
+    }
     
-    # Initialize volume array
-    volume = np.zeros((img_shape[0], img_shape[1], len(dcm_files)), dtype=np.float64)
+    # Check every header before allocating the volume, so an inconsistent
+    # series fails fast instead of after a large allocation; the first
+    # header is already in hand, so only the rest are read
+    first_geometry = (first_slice.Rows, first_slice.Columns,
+                      getattr(first_slice, 'BitsAllocated', None))
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        geometries = [first_geometry] + list(executor.map(_read_slice_geometry, dcm_files[1:]))
+    if len(set(geometries)) > 1:
+        expected = Counter(geometries).most_common(1)[0][0]
+        offending = [f"{os.path.basename(path)} {geometry}"
+                     for path, geometry in zip(dcm_files, geometries) if geometry != expected]
+        raise ValueError(
+            f"Inconsistent slice geometry (Rows, Columns, BitsAllocated): expected {expected}, "
+            f"{len(offending)} file(s) differ: {', '.join(offending[:10])}"
+            + (" ..." if len(offending) > 10 else "")
+        )
     
-    # Load all slices
-    metadata = {}
-    for i, dcm_file in enumerate(tqdm(dcm_files, desc="Loading DICOM slices")):
-        ds = pydicom.dcmread(dcm_file)
-        volume[:, :, i] = ds.pixel_array.astype(np.float64)
+    def read_slice(i):
+        # At each batch boundary, queue readahead for the next batch so the
+        # disk keeps many requests in flight while workers decode this one
+        if i % READAHEAD_BATCH == 0:
+            _readahead(dcm_files[i + READAHEAD_BATCH:i + 2 * READAHEAD_BATCH])
+        return _read_slice_pixels(dcm_files[i])
+    
+    # Load all slices; file reads and pixel decoding release the GIL, so
+    # a thread pool overlaps them across files (results arrive in order)
+    _readahead(dcm_files[:READAHEAD_BATCH])
+    n_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # Workers decode ahead of the copy loop, but only a bounded number
+        # of slices, so decoded arrays can't pile up faster than they're
+        # stored (executor.map would submit the whole series at once)
+        slices = _bounded_map(executor, read_slice, range(len(dcm_files)), 2 * n_workers)
+        
+        # Size the volume from the first decoded slice
+        first_pixels = next(slices)
+        img_shape = first_pixels.shape
+        
+        # Normalized volumes are float32 from the start so they can be scaled
+        # in place; otherwise keep the native pixel dtype (usually uint16).
+        # Every voxel is overwritten, so the buffer needs no zero-fill. Slices
+        # lie along the first axis so each one is a single contiguous block
+        volume_shape = (len(dcm_files), img_shape[0], img_shape[1])
+        volume_dtype = np.float32 if normalize else first_pixels.dtype
+        if out is not None:
+            volume = np.memmap(out, dtype=volume_dtype, mode='w+', shape=volume_shape)
+        else:
+            volume = _empty_volume(volume_shape, volume_dtype)
+        # Converting into float32 is expected; a native volume only accepts
+        # slices whose dtype converts without loss
+        convert_casting = 'same_kind' if normalize else 'safe'
         
-        # Store metadata from first slice
-        if i == 0:
-            metadata = {
-                'PixelSpacing': getattr(ds, 'PixelSpacing', None),
-                'SliceThickness': getattr(ds, 'SliceThickness', None),
-                'ImageOrientationPatient': getattr(ds, 'ImageOrientationPatient', None),
-                'ImagePositionPatient': getattr(ds, 'ImagePositionPatient', None),
-                'Rows': ds.Rows,
-                'Columns': ds.Columns,
-                'NumberOfSlices': len(dcm_files)
-            }
-    
-    # Normalize if requested
+        # Refresh the bar at ~1% granularity rather than on every slice
+        progress = tqdm(chain([first_pixels], slices), total=len(dcm_files), desc="Loading DICOM slices",
+                        miniters=max(1, len(dcm_files) // 100), mininterval=0.5)
+        vmax = None
+        for i, pixels in enumerate(progress):
+            if pixels.shape != img_shape:
+                raise ValueError(f"Slice {dcm_files[i]} has shape {pixels.shape}, expected {img_shape}")
+            # Matching dtypes take the plain memcpy path
+            np.copyto(volume[i], pixels, casting='no' if pixels.dtype == volume.dtype else convert_casting)
+            if normalize:
+                # Track the maximum while the slice is still in cache instead
+                # of sweeping the whole volume again afterwards
+                slice_max = pixels.max()
+                if vmax is None or slice_max > vmax:
+                    vmax = slice_max
+    
+    # Normalize if requested, in place as a multiply by the reciprocal
     if normalize:
-        volume = volume / np.max(volume)
+        if vmax > 0:
+            np.multiply(volume, np.float32(1.0 / float(vmax)), out=volume)
+        else:
+            print(f"Warning: volume maximum is {vmax}; leaving it unnormalized")
+    
+    if out is not None:
+        volume.flush()
     
-    print(f"Volume loaded successfully. Dimensions: {volume.shape[0]} x {volume.shape[1]} x {volume.shape[2]}")
+    print(f"Volume loaded successfully. Dimensions (slices x height x width): "
+          f"{volume.shape[0]} x {volume.shape[1]} x {volume.shape[2]}")
     
     return volume, metadata
 
 
-def save_volume_as_tif(volume: np.ndarray, output_path: str, bit_depth: int = 16):
+def save_volume_as_tif(volume: np.ndarray, output_path: str, bit_depth: int = 16,
+                       compression: Optional[str] = None):
     """
     Save 3D volume as multi-page TIFF file.
     
     Parameters:
     -----------
     volume : np.ndarray
-        3D volume array
+        3D volume array of shape (slices, height, width), one TIFF page per slice
     output_path : str
         Output file path
     bit_depth : int
         Bit depth for output (8 or 16)
+    compression : str, optional
+        TIFF compression ('zstd', 'zlib' or None/'none'). Uncompressed by
+        default so the file can be memory-mapped (tifffile.memmap) by the
+        loaders downstream; compressed files are smaller on disk but must be
+        read fully and need imagecodecs to open. 'zstd' needs imagecodecs
+        and falls back to 'none' without it
     """
     from tifffile import imwrite
     
@@ -96,15 +291,40 @@ def save_volume_as_tif(volume: np.ndarray, output_path: str, bit_depth: int = 16
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     if bit_depth == 16:
-        volume_out = (volume * 65535).astype(np.uint16)
+        scale, out_dtype = 65535.0, np.uint16
     elif bit_depth == 8:
-        volume_out = (volume * 255).astype(np.uint8)
+        scale, out_dtype = 255.0, np.uint8
     else:
         raise ValueError("bit_depth must be 8 or 16")
     
+    def scaled_pages():
+        # Scale one slice at a time through reusable buffers, so neither a
+        # float temporary nor the integer volume is ever held in full
+        scratch = np.empty(volume.shape[1:], dtype=np.float32)
+        page = np.empty(volume.shape[1:], dtype=out_dtype)
+        for j in range(volume.shape[0]):
+            np.multiply(volume[j], scale, out=scratch)
+            np.rint(scratch, out=scratch)
+            # Clamp so values outside [0, 1] saturate instead of wrapping
+            np.clip(scratch, 0, scale, out=scratch)
+            np.copyto(page, scratch, casting='unsafe')
+            yield page
+    
+    if compression == 'zstd' and not IMAGECODECS_AVAILABLE:
+        print("imagecodecs not installed; saving uncompressed")
+        compression = 'none'
+    # Fast compression levels: far fewer bytes to disk for little CPU
+    compressionargs = {'level': 1} if compression in ('zstd', 'zlib') else None
+    # Compressed writes don't switch to BigTIFF automatically
+    bigtiff = volume.size * np.dtype(out_dtype).itemsize > 2**31
+    
     print(f"Saving volume to: {output_path}")
-    imwrite(output_path, volume_out, compression='none')
-    print(f"Successfully saved {volume_out.shape[2]} slices")
+    # Pages are always grayscale; saying so skips tifffile's photometric
+    # guessing (which would read a trailing axis of 3 or 4 as RGB)
+    imwrite(output_path, scaled_pages(), shape=volume.shape, dtype=out_dtype,
+            photometric='minisblack', compression=compression,
+            compressionargs=compressionargs, bigtiff=bigtiff)
+    print(f"Successfully saved {volume.shape[0]} slices")
 
 
 if __name__ == "__main__":
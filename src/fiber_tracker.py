@@ -5,19 +5,119 @@ Interactive tool for manually tracking optical fibers in registered microCT mous
 with automatic brain region identification using Allen CCF.
 
 Dependencies:
-pip install numpy tifffile matplotlib pandas nrrd requests SimpleITK
+pip install numpy tifffile matplotlib nrrd requests SimpleITK
 """
 
 import numpy as np
 import tifffile
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, Slider
-import pandas as pd
+from matplotlib.collections import LineCollection
+from matplotlib.colors import ListedColormap
+from matplotlib.lines import Line2D
+from matplotlib.markers import MarkerStyle
 from pathlib import Path
+from collections import defaultdict
+import io
 import json
+import csv
+import hashlib
+import pickle
 import requests
 import SimpleITK as sitk
 
+try:
+    # orjson parses saved fiber data several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    # Progress saves use compressed Feather when pyarrow is installed
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _sample_annotation(points_zyx, A, t, spacing, annotation, ccf_out, ids_out):
+        """Affine-map (z, y, x) voxels into CCF voxels and read their IDs (-1 outside)"""
+        nz, ny, nx = annotation.shape
+        for i in prange(points_zyx.shape[0]):
+            # Physical (x, y, z) in mm, as SimpleITK expects
+            px = points_zyx[i, 2] * spacing
+            py = points_zyx[i, 1] * spacing
+            pz = points_zyx[i, 0] * spacing
+            xi = int(round((A[0, 0] * px + A[0, 1] * py + A[0, 2] * pz + t[0]) / spacing))
+            yi = int(round((A[1, 0] * px + A[1, 1] * py + A[1, 2] * pz + t[1]) / spacing))
+            zi = int(round((A[2, 0] * px + A[2, 1] * py + A[2, 2] * pz + t[2]) / spacing))
+            ccf_out[i, 0] = zi
+            ccf_out[i, 1] = yi
+            ccf_out[i, 2] = xi
+            if 0 <= zi < nz and 0 <= yi < ny and 0 <= xi < nx:
+                ids_out[i] = annotation[zi, yi, xi]
+            else:
+                ids_out[i] = -1
+
+
+def peek_json_array(text, count):
+    """Decode only the first `count` items of a JSON array given as text"""
+    decoder = json.JSONDecoder()
+    items = []
+    idx = text.index('[') + 1
+    while len(items) < count:
+        while idx < len(text) and text[idx] in ' \t\r\n,':
+            idx += 1
+        if idx >= len(text) or text[idx] == ']':
+            break
+        item, idx = decoder.raw_decode(text, idx)
+        items.append(item)
+    return items
+
+
+def compact_annotation(data):
+    """Return `data` as a C-contiguous array of the smallest unsigned dtype that holds its labels"""
+    if data.size and data.min() >= 0:
+        dtype = np.uint16 if data.max() < 2**16 else np.uint32
+    else:
+        dtype = data.dtype
+    return np.ascontiguousarray(data, dtype=dtype)
+
+
+def annotation_cache_is_fresh(cache_path, source_path):
+    """True if `cache_path` holds compact labels at least as new as `source_path`"""
+    if not cache_path.exists() or cache_path.stat().st_mtime < source_path.stat().st_mtime:
+        return False
+    # Older caches hold the raw Fortran-ordered NRRD array
+    cached = np.load(cache_path, mmap_mode='r')
+    return cached.flags.c_contiguous and cached.dtype in (np.uint16, np.uint32)
+
+
+# Largest structure ID for which a dense ID -> row table is built; CCFv3
+# 2017 IDs reach ~6e8, where the sorted-ID search is used instead
+ID_LUT_MAX_ID = 1_000_000
+
+# Downloaded ontology is kept here so later launches skip the network
+ONTOLOGY_CACHE_PATH = Path.home() / '.cache' / 'mfactpy' / 'allen_ccf_ontology.json'
+
+# Bump when the layout of the parsed-table cache (.npz + .pkl) changes
+ONTOLOGY_TABLES_VERSION = 1
+
 
 class AllenCCFOntology:
     """Handler for Allen CCF structure tree and region lookups"""
@@ -27,11 +127,24 @@ class AllenCCFOntology:
         self.id_to_info = {}
         self.acronym_to_id = {}
         self.name_to_id = {}
+        self.id_to_ancestors = {}
+        self.id_to_acronym_chain = {}
+        
+        # Structure-of-arrays view of id_to_info for bulk lookups, rows in ID order
+        self._ids = np.empty(0, dtype=np.int64)
+        self._parent = np.empty(0, dtype=np.int64)
+        self._names = np.empty(0, dtype=object)
+        self._acronyms = np.empty(0, dtype=object)
+        self._id2row = {}
+        self._id_to_row_lut = None
         
         if ontology_path and Path(ontology_path).exists():
             self.load_ontology_from_file(ontology_path)
         else:
-            self.download_ontology()
+            if ONTOLOGY_CACHE_PATH.exists():
+                self.load_ontology_from_file(ONTOLOGY_CACHE_PATH)
+            if not self.id_to_info:
+                self.download_ontology()
     
     def download_ontology(self):
         """Download Allen CCF ontology from Allen Institute API"""
@@ -41,28 +154,110 @@ class AllenCCFOntology:
         try:
             response = requests.get(url, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             self.parse_ontology(data)
             print(">>> Ontology downloaded successfully")
         except Exception as e:
             print(f"Warning: Could not download ontology: {e}")
+            return
+        
+        # Write to a temporary file and rename so an interrupted write never
+        # leaves a truncated cache behind
+        try:
+            ONTOLOGY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = ONTOLOGY_CACHE_PATH.with_suffix('.json.tmp')
+            tmp_path.write_bytes(response.content)
+            tmp_path.replace(ONTOLOGY_CACHE_PATH)
+            print(f"    Cached ontology to {ONTOLOGY_CACHE_PATH}")
+        except OSError as e:
+            print(f"    Warning: could not cache ontology: {e}")
+            return
+        self.save_parsed_tables(ONTOLOGY_CACHE_PATH, self.ontology_digest(response.content))
     
     def load_ontology_from_file(self, path):
-        """Load ontology from local JSON file"""
+        """Load ontology from local JSON file, preferring its parsed-table cache"""
         print(f"Loading ontology from {path}...")
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-            self.parse_ontology(data)
+            raw = Path(path).read_bytes()
+            digest = self.ontology_digest(raw)
+            if not self.load_parsed_tables(path, digest):
+                self.parse_ontology(json_loads(raw))
+                self.save_parsed_tables(path, digest)
             print(">>> Ontology loaded successfully")
         except Exception as e:
             print(f"Warning: Could not load ontology: {e}")
     
+    @staticmethod
+    def ontology_digest(raw):
+        """Version key tying a parsed-table cache to the exact ontology JSON"""
+        return f"{ONTOLOGY_TABLES_VERSION}:{hashlib.sha1(raw).hexdigest()}"
+    
+    def save_parsed_tables(self, json_path, digest):
+        """
+        Save the parsed lookup tables next to the ontology JSON
+        
+        Numeric arrays go to a .npz, dicts and name/acronym arrays to a .pkl;
+        both carry `digest` so a stale or mismatched pair is never used.
+        """
+        json_path = Path(json_path)
+        lut = self._id_to_row_lut if self._id_to_row_lut is not None else np.empty(0, dtype=np.int32)
+        tables = {
+            'digest': digest,
+            'id_to_info': self.id_to_info,
+            'acronym_to_id': self.acronym_to_id,
+            'name_to_id': self.name_to_id,
+            'id_to_ancestors': self.id_to_ancestors,
+            'id_to_acronym_chain': self.id_to_acronym_chain,
+            'names': self._names,
+            'acronyms': self._acronyms,
+        }
+        try:
+            with open(json_path.with_suffix('.npz'), 'wb') as f:
+                np.savez(f, digest=np.array(digest), ids=self._ids, parent=self._parent, id_to_row=lut)
+            with open(json_path.with_suffix('.pkl'), 'wb') as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"    Warning: could not cache parsed ontology: {e}")
+    
+    def load_parsed_tables(self, json_path, digest):
+        """Restore lookup tables saved by save_parsed_tables; False if missing or stale"""
+        json_path = Path(json_path)
+        try:
+            with np.load(json_path.with_suffix('.npz')) as arrays:
+                if str(arrays['digest']) != digest:
+                    return False
+                ids = arrays['ids']
+                parent = arrays['parent']
+                lut = arrays['id_to_row']
+            with open(json_path.with_suffix('.pkl'), 'rb') as f:
+                tables = pickle.load(f)
+            if tables.get('digest') != digest:
+                return False
+        except Exception:
+            return False
+        
+        self.id_to_info = tables['id_to_info']
+        self.acronym_to_id = tables['acronym_to_id']
+        self.name_to_id = tables['name_to_id']
+        self.id_to_ancestors = tables['id_to_ancestors']
+        self.id_to_acronym_chain = tables['id_to_acronym_chain']
+        self._ids = ids
+        self._parent = parent
+        self._names = tables['names']
+        self._acronyms = tables['acronyms']
+        self._id2row = {struct_id: row for row, struct_id in enumerate(ids.tolist())}
+        self._id_to_row_lut = lut if lut.size else None
+        return True
+    
     def parse_ontology(self, data):
         """Parse ontology JSON data - handles hierarchical structure tree"""
+        # Start parsing from the msg field or root
+        root = data['msg'] if 'msg' in data else data
         
-        def parse_structure_tree(node):
-            """Recursively parse the structure tree"""
+        # Walk the tree with an explicit stack (pre-order, same as recursion)
+        stack = [root]
+        while stack:
+            node = stack.pop()
             if isinstance(node, dict):
                 if 'id' in node:
                     struct_id = node['id']
@@ -83,20 +278,94 @@ class AllenCCFOntology:
                     if name:
                         self.name_to_id[name] = struct_id
                 
-                # Recursively process children
+                # Process children
                 if 'children' in node:
-                    for child in node['children']:
-                        parse_structure_tree(child)
-                        
+                    stack.extend(reversed(node['children']))
+                    
             elif isinstance(node, list):
-                for item in node:
-                    parse_structure_tree(item)
+                stack.extend(reversed(node))
         
-        # Start parsing from the msg field or root
-        if 'msg' in data:
-            parse_structure_tree(data['msg'])
+        self.build_ancestor_chains()
+        self.build_lookup_arrays()
+    
+    def build_ancestor_chains(self):
+        """Precompute each region's name/acronym path up to (not including) root"""
+        self.id_to_ancestors = {}
+        self.id_to_acronym_chain = {}
+        # Parents are shallower, so their chains are ready before their children's
+        for struct_id, info in sorted(self.id_to_info.items(), key=lambda item: item[1]['depth']):
+            names = [info['name']]
+            acronyms = [info['acronym']]
+            parent_id = info['parent_id']
+            if parent_id is not None and parent_id != 997:  # stop below root
+                if parent_id in self.id_to_ancestors:
+                    names += self.id_to_ancestors[parent_id]
+                    acronyms += self.id_to_acronym_chain[parent_id]
+                else:
+                    parent_info = self.get_region_info(parent_id)
+                    names.append(parent_info['name'])
+                    acronyms.append(parent_info['acronym'])
+            self.id_to_ancestors[struct_id] = names
+            self.id_to_acronym_chain[struct_id] = acronyms
+    
+    def build_lookup_arrays(self):
+        """Build sorted ID/parent arrays with parallel name and acronym arrays"""
+        ids = sorted(self.id_to_info)
+        infos = [self.id_to_info[struct_id] for struct_id in ids]
+        self._ids = np.array(ids, dtype=np.int64)
+        self._parent = np.array([-1 if info['parent_id'] is None else info['parent_id'] for info in infos],
+                                dtype=np.int64)
+        self._names = np.array([info['name'] for info in infos], dtype=object)
+        self._acronyms = np.array([info['acronym'] for info in infos], dtype=object)
+        self._id2row = {struct_id: row for row, struct_id in enumerate(ids)}
+        
+        # Dense ID -> row table, so bulk lookups are a single gather
+        self._id_to_row_lut = None
+        if ids and 0 <= ids[0] and ids[-1] <= ID_LUT_MAX_ID:
+            self._id_to_row_lut = np.full(ids[-1] + 1, -1, dtype=np.int32)
+            self._id_to_row_lut[self._ids] = np.arange(len(ids), dtype=np.int32)
+    
+    def get_regions_bulk(self, region_ids):
+        """
+        Look up many region IDs at once
+        
+        Parameters:
+        -----------
+        region_ids : array-like of int
+            Region IDs, e.g. annotation values sampled along a fiber
+        
+        Returns:
+        --------
+        rows : np.ndarray
+            Row of each ID in the lookup arrays (-1 if not in the ontology)
+        names, acronyms : np.ndarray of str
+            Region names and acronyms, with the same placeholders as get_region_info
+        """
+        region_ids = np.asarray(region_ids, dtype=np.int64)
+        lut = self._id_to_row_lut
+        if lut is not None:
+            in_range = (region_ids >= 0) & (region_ids < len(lut))
+            rows = np.where(in_range, lut[np.where(in_range, region_ids, 0)], -1)
+            found = rows >= 0
+        elif len(self._ids):
+            rows = np.minimum(np.searchsorted(self._ids, region_ids), len(self._ids) - 1)
+            found = self._ids[rows] == region_ids
         else:
-            parse_structure_tree(data)
+            rows = np.zeros(region_ids.shape, dtype=np.intp)
+            found = np.zeros(region_ids.shape, dtype=bool)
+        rows = np.where(found, rows, -1)
+        
+        names = np.empty(region_ids.shape, dtype=object)
+        acronyms = np.empty(region_ids.shape, dtype=object)
+        names[found] = self._names[rows[found]]
+        acronyms[found] = self._acronyms[rows[found]]
+        # Background and unknown IDs are rare, so fill them one by one
+        for idx in zip(*np.nonzero(~found)):
+            info = self.get_region_info(int(region_ids[idx]))
+            names[idx] = info['name']
+            acronyms[idx] = info['acronym']
+        
+        return rows, names, acronyms
     
     def get_region_info(self, region_id):
         """Get information about a brain region"""
@@ -119,20 +388,27 @@ class AllenCCFOntology:
     
     def get_region_hierarchy(self, region_id, max_depth=10):
         """Get hierarchical path from region to root"""
-        hierarchy = []
-        current_id = region_id
-        depth = 0
-        
-        while current_id is not None and depth < max_depth:
-            info = self.get_region_info(current_id)
-            hierarchy.append(info['name'])
-            current_id = info.get('parent_id')
-            depth += 1
-            
-            if current_id == 997:  # root
-                break
-        
-        return hierarchy
+        hierarchy = self.id_to_ancestors.get(region_id)
+        if hierarchy is None:
+            # Background or an ID missing from the ontology
+            return [self.get_region_info(region_id)['name']][:max_depth]
+        return hierarchy[:max_depth]
+
+
+# Maximum number of CCF voxels whose region lookup is kept
+VOXEL_CACHE_SIZE = 4096
+
+# Fallback location for decoded annotation caches when the NRRD's folder is read-only
+ANNOTATION_CACHE_DIR = ONTOLOGY_CACHE_PATH.parent
+
+# Margin in voxels kept around the fibers when cropping the horizontal view
+HORIZONTAL_VIEW_PAD = 50
+
+# In-plane stride for the slices drawn in the CCF overlay figure
+CCF_OVERLAY_STRIDE = 2
+
+# Fiber endpoints in microCT voxels (z, y, x), one record per saved fiber
+FIBER_DTYPE = np.dtype([('id', 'i4'), ('top', '3i4'), ('bottom', '3i4')])
 
 
 class FiberTracker:
@@ -140,7 +416,7 @@ class FiberTracker:
     
     def __init__(self, microct_image_path, ccf_annotation_path=None, 
                  transform_path=None, ontology_path=None, output_dir=None,
-                 spacing=0.025, use_registered=False):
+                 spacing=0.025, use_registered=False, debug=False):
         """Initialize fiber tracker
         
         Parameters:
@@ -160,17 +436,20 @@ class FiberTracker:
         use_registered : bool
             True if using microct_registered.tif (already in CCF space, no transform needed)
             False if using microct_aligned.tif (needs transform to map to CCF)
+        debug : bool
+            Print the step-by-step coordinate transform and region lookup on each click
         """
         print("="*70)
         print("FIBER TRACKER - INITIALIZATION")
         print("="*70)
         
         print(f"\nLoading microCT image...")
-        self.image = tifffile.imread(microct_image_path)
+        self.image = self.to_display_uint8(tifffile.imread(microct_image_path))
         print(f">>> Image loaded. Shape: {self.image.shape}")
         
         self.spacing = spacing
         self.use_registered = use_registered
+        self.debug = debug
         print(f">>> Voxel spacing: {spacing} mm ({spacing*1000} um)")
         print(f">>> Image type: {'REGISTERED (in CCF space)' if use_registered else 'ALIGNED (original space)'}")
         
@@ -178,12 +457,19 @@ class FiberTracker:
         self.ontology = AllenCCFOntology(ontology_path)
         
         self.transform = None
+        self.transform_affine = None
         if transform_path and not use_registered:
             self.load_transform(transform_path)
         elif use_registered:
             print("\n>>> Using registered image - no transform needed")
         
         self.ccf_annotation = None
+        self.voxel_cache = {}
+        # Overlay rendering: sorted labels present in the annotation, one
+        # colormap entry per label, and downsampled per-slice label indices
+        self.ccf_labels = None
+        self.ccf_label_cmap = None
+        self.ccf_index_cache = {}
         if ccf_annotation_path:
             self.load_ccf_annotation(ccf_annotation_path)
         
@@ -195,23 +481,104 @@ class FiberTracker:
         self.nz, self.ny, self.nx = self.image.shape
         self.current_slice = self.nz // 2
         
+        # In-plane downsampled copies for display; level L is 2**L smaller
+        self.pyramid = self.build_pyramid()
+        self.display_level = 0
+        # Per-slice (vmin, vmax) contrast limits, filled on first view
+        self.clim_cache = {}
+        
         self.fibers = []
+        # Endpoint coordinates parallel to self.fibers, for vectorized
+        # per-slice selection; grown by doubling
+        self.fiber_coords = np.empty(16, dtype=FIBER_DTYPE)
+        # Region name/acronym per fiber, also parallel to self.fibers
+        self.fiber_region_names = []
+        self.fiber_acronyms = []
+        # Display strings built once per fiber: legend label and report hierarchy
+        self.fiber_label_texts = []
+        self.fiber_hierarchy_texts = []
+        # Slice Z -> rows of the fibers whose top/bottom lies on it, in row order
+        self.fibers_by_top_z = defaultdict(list)
+        self.fibers_by_bottom_z = defaultdict(list)
         self.current_fiber = {'top': None, 'bottom': None}
-        self.current_points = []
         
         self.fiber_colors = plt.cm.tab10(np.linspace(0, 1, 10))
         
         self.fig = None
         self.ax = None
         self.im = None
+        self.colorbar = None
         self.slice_slider = None
         self.info_text = None
         
+        # Persistent fiber artists, created in start() and updated in place
+        self.endpoint_scatter = None
+        self.marker_paths = {}
+        self.segment_lines = None
+        self.current_top_marker = None
+        self.current_bottom_marker = None
+        self.current_line = None
+        # Legend of saved fibers, rebuilt only when the fiber set changes
+        self.fiber_legend = None
+        # Signature of the fibers at the last progress save, to skip repeats
+        self.last_save_signature = None
+        # (slice, fiber count) the fiber artists currently show
+        self.rendered_fiber_state = None
+        # Static figure content saved after each full draw, for blitting
+        self.background = None
+        # Single-shot timer that coalesces refresh requests into one blit
+        self.refresh_timer = None
+        self.refresh_pending = False
+        
         self.check_previous_work()
         
         print("\n>>> Initialization complete!")
         print("="*70)
     
+    @staticmethod
+    def to_display_uint8(image):
+        """
+        Rescale a volume to uint8 for display
+        
+        The image is only drawn, never used for region lookup, so 8 bits are
+        enough. The 1st/99th percentiles of non-zero voxels (estimated on a
+        strided subsample) map to 0/255.
+        """
+        if image.dtype == np.uint8:
+            return image
+        
+        sample = image[::4, ::4, ::4]
+        sample = sample[sample > 0]
+        if sample.size == 0:
+            return np.zeros(image.shape, dtype=np.uint8)
+        lo, hi = np.percentile(sample, [1, 99])
+        scale = 255.0 / (hi - lo) if hi > lo else 1.0
+        
+        # One slice at a time to bound temporary float memory
+        display = np.empty(image.shape, dtype=np.uint8)
+        for z in range(image.shape[0]):
+            s = (image[z].astype(np.float32) - lo) * scale
+            np.clip(s, 0, 255, out=s)
+            display[z] = s
+        print(f">>> Rescaled {image.dtype} image to uint8 for display (range {lo:.1f}-{hi:.1f})")
+        return display
+    
+    def build_pyramid(self, min_size=256):
+        """Build 2x in-plane downsampled copies of the image down to min_size pixels"""
+        levels = [self.image]
+        while min(levels[-1].shape[1:]) // 2 >= min_size:
+            prev = levels[-1]
+            ny2, nx2 = prev.shape[1] // 2 * 2, prev.shape[2] // 2 * 2
+            level = np.empty((prev.shape[0], ny2 // 2, nx2 // 2), dtype=prev.dtype)
+            # 2x2 box average, one slice at a time to bound temporary memory
+            for z in range(prev.shape[0]):
+                s = prev[z, :ny2, :nx2].astype(np.float32)
+                level[z] = (s[0::2, 0::2] + s[1::2, 0::2] + s[0::2, 1::2] + s[1::2, 1::2]) * 0.25
+            levels.append(level)
+        if len(levels) > 1:
+            print(f">>> Display pyramid: {len(levels)} levels (coarsest {levels[-1].shape[1:]})")
+        return levels
+    
     def load_transform(self, transform_path):
         """Load registration transform (microCT aligned -> CCF)"""
         print(f"\nLoading registration transform from: {transform_path}")
@@ -219,24 +586,84 @@ class FiberTracker:
             self.transform = sitk.ReadTransform(str(transform_path))
             print(f">>> Transform loaded: {self.transform.GetName()}")
             print(">>> This transform maps: microCT_aligned -> CCF")
+            self.transform_affine = self.get_affine_parameters(self.transform)
+            if self.transform_affine is not None:
+                print(">>> Linear transform: points are mapped with a matrix multiply")
         except Exception as e:
             print(f"ERROR: Could not load transform: {e}")
             self.transform = None
+            self.transform_affine = None
+    
+    @staticmethod
+    def get_affine_parameters(transform):
+        """Return (A, t) with transform(p) == A @ p + t for linear transforms, else None"""
+        try:
+            if not transform.IsLinear():
+                return None
+        except AttributeError:  # SimpleITK < 2.0
+            return None
+        # A linear transform is fully determined by where it sends the origin
+        # and the three unit vectors (this also covers linear composites)
+        t = np.array(transform.TransformPoint((0.0, 0.0, 0.0)))
+        A = np.column_stack([np.array(transform.TransformPoint(tuple(e))) - t for e in np.eye(3)])
+        return A, t
+    
+    def apply_transform_bulk(self, points_xyz):
+        """Apply self.transform to an (N, 3) array of physical (x, y, z) points"""
+        points_xyz = np.asarray(points_xyz, dtype=np.float64)
+        if self.transform_affine is not None:
+            A, t = self.transform_affine
+            return points_xyz @ A.T + t
+        # Non-linear transforms (e.g. displacement fields) go point by point
+        return np.array([self.transform.TransformPoint(point.tolist()) for point in points_xyz])
     
     def load_ccf_annotation(self, ccf_annotation_path):
         """Load Allen CCF annotation volume"""
         print(f"\nLoading CCF annotation from: {ccf_annotation_path}")
         path = Path(ccf_annotation_path)
+        self.voxel_cache = {}  # cached lookups belong to the previous volume
+        self.ccf_labels = None
+        self.ccf_label_cmap = None
+        self.ccf_index_cache = {}
         
         try:
             if path.suffix == '.nrrd':
                 import nrrd
-                self.ccf_annotation, header = nrrd.read(str(path))
-                print(f">>> CCF annotation loaded. Shape: {self.ccf_annotation.shape}")
+                # Decode the NRRD once into a .npy cache next to it (or in the
+                # user cache folder if that is read-only), then memory-map the
+                # cache so only voxels that are looked up get paged in
+                path_key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:8]
+                cache_paths = [path.with_suffix('.npy'),
+                               ANNOTATION_CACHE_DIR / f"{path.stem}_{path_key}.npy"]
+                cache_path = next((p for p in cache_paths if annotation_cache_is_fresh(p, path)), None)
+                if cache_path is None:
+                    data, header = nrrd.read(str(path))
+                    # Store labels compact and C-ordered so mapped reads stay small
+                    data = compact_annotation(data)
+                    for candidate in cache_paths:
+                        try:
+                            candidate.parent.mkdir(parents=True, exist_ok=True)
+                            np.save(candidate, data)
+                            cache_path = candidate
+                            break
+                        except OSError as e:
+                            print(f"    Warning: could not write cache {candidate}: {e}")
+                    if cache_path is None:
+                        self.ccf_annotation = data
+                    del data
+                else:
+                    header = nrrd.read_header(str(path))
+                if cache_path is not None:
+                    self.ccf_annotation = np.load(cache_path, mmap_mode='r')
+                print(f">>> CCF annotation loaded. Shape: {self.ccf_annotation.shape}, dtype: {self.ccf_annotation.dtype}")
                 # Check if we need to transpose (Allen CCF is typically in different order)
                 print(f"    Header info: {header.get('space', 'unknown')}")
             elif path.suffix in ['.tif', '.tiff']:
-                self.ccf_annotation = tifffile.imread(str(path))
+                try:
+                    self.ccf_annotation = tifffile.memmap(str(path), mode='r')
+                except ValueError:
+                    # Compressed/tiled TIFFs can't be mapped
+                    self.ccf_annotation = compact_annotation(tifffile.imread(str(path)))
                 print(f">>> CCF annotation loaded. Shape: {self.ccf_annotation.shape}")
             else:
                 raise ValueError(f"Unsupported format: {path.suffix}")
@@ -249,6 +676,7 @@ class FiberTracker:
         """Check if previous tracking work exists and ask user"""
         # Check for both progress file and final outputs
         progress_file = self.output_dir / 'fiber_tracking_progress.json'
+        progress_table_file = self.output_dir / 'fiber_tracking_progress.feather'
         final_data_file = self.output_dir / 'fiber_data.json'
         final_csv_file = self.output_dir / 'fiber_report.csv'
         
@@ -260,6 +688,11 @@ class FiberTracker:
             # Final output exists - prefer this over progress
             load_file = final_data_file if final_data_file.exists() else None
             file_type = "final"
+        elif PYARROW_AVAILABLE and progress_table_file.exists() and \
+                (not progress_file.exists() or
+                 progress_table_file.stat().st_mtime >= progress_file.stat().st_mtime):
+            load_file = progress_table_file
+            file_type = "progress"
         elif progress_file.exists():
             # Only progress file exists
             load_file = progress_file
@@ -273,12 +706,19 @@ class FiberTracker:
         print("="*70)
         
         try:
-            with open(load_file, 'r') as f:
-                saved_data = json.load(f)
-            
-            num_fibers = len(saved_data)
+            # Only count the fibers and decode the first few for the summary;
+            # the full parse happens if the user chooses to continue
+            if load_file.suffix == '.feather':
+                table = feather.read_table(str(load_file))
+                num_fibers = table.num_rows
+                preview = table.slice(0, 5).to_pylist()
+            else:
+                raw = load_file.read_bytes()
+                text = raw.decode('utf-8')
+                num_fibers = text.count('"fiber_id"')
+                preview = peek_json_array(text, 5) if num_fibers > 0 else []
             print(f"\nFound {num_fibers} previously tracked fiber(s)")
-            print(f"Source: {load_file}")
+            print(f"Source: {load_file} ({load_file.stat().st_size / 1024:.1f} KB)")
             
             if file_type == "final":
                 print("Type: FINAL OUTPUT (completed session)")
@@ -288,7 +728,7 @@ class FiberTracker:
             # Show summary of previous fibers
             if num_fibers > 0:
                 print("\nPrevious fibers:")
-                for fiber_dict in saved_data[:5]:  # Show first 5
+                for fiber_dict in preview:  # Show first 5
                     fid = fiber_dict['fiber_id']
                     region = fiber_dict.get('region_name', 'N/A')
                     acronym = fiber_dict.get('region_acronym', 'N/A')
@@ -314,7 +754,10 @@ class FiberTracker:
                 print("Invalid choice. Please enter 'c', 'r', or 'q'")
             
             if response == 'c':
-                self.load_previous_work(saved_data)
+                if load_file.suffix == '.feather':
+                    self.load_previous_work(table.to_pylist())
+                else:
+                    self.load_previous_work(json_loads(raw))
                 print(f"\n>>> Loaded {len(self.fibers)} fiber(s)")
                 print(">>> You can continue adding more fibers or use 'Undo Last Fiber' to modify")
             elif response == 'r':
@@ -338,14 +781,13 @@ class FiberTracker:
                 'id': fiber_dict['fiber_id'],
                 'top': (fiber_dict['top_z'], fiber_dict['top_y'], fiber_dict['top_x']),
                 'bottom': (fiber_dict['bottom_z'], fiber_dict['bottom_y'], fiber_dict['bottom_x']),
-                'color': self.fiber_colors[fiber_dict['fiber_id'] % len(self.fiber_colors)].tolist(),
                 'region_id': fiber_dict.get('region_id'),
                 'region_name': fiber_dict.get('region_name', 'N/A'),
                 'region_acronym': fiber_dict.get('region_acronym', 'N/A'),
                 'region_hierarchy': fiber_dict.get('region_hierarchy', []),
                 'ccf_coords': fiber_dict.get('ccf_coords')
             }
-            self.fibers.append(fiber)
+            self.add_fiber(fiber)
     
     def transform_point_to_ccf(self, z, y, x):
         """Transform point from microCT space to CCF annotation space
@@ -366,7 +808,8 @@ class FiberTracker:
         
         if self.use_registered:
             # Image is already in CCF space - direct 1:1 mapping
-            print(f"  ✓ Direct mapping (registered→CCF): ({z},{y},{x})")
+            if self.debug:
+                print(f"  ✓ Direct mapping (registered→CCF): ({z},{y},{x})")
             return (z, y, x)
         
         # Using aligned image - need transform
@@ -379,19 +822,22 @@ class FiberTracker:
             # SimpleITK uses (x, y, z) order for physical coordinates
             point_physical = [x * self.spacing, y * self.spacing, z * self.spacing]
             
-            print(f"  Voxel→Physical: ({point_physical[0]:.3f}, {point_physical[1]:.3f}, {point_physical[2]:.3f}) mm")
+            if self.debug:
+                print(f"  Voxel→Physical: ({point_physical[0]:.3f}, {point_physical[1]:.3f}, {point_physical[2]:.3f}) mm")
             
             # Apply FORWARD transform: microCT_aligned → CCF
-            ccf_physical = self.transform.TransformPoint(point_physical)
+            ccf_physical = self.apply_transform_bulk([point_physical])[0]
             
-            print(f"  Transform→CCF Physical: ({ccf_physical[0]:.3f}, {ccf_physical[1]:.3f}, {ccf_physical[2]:.3f}) mm")
+            if self.debug:
+                print(f"  Transform→CCF Physical: ({ccf_physical[0]:.3f}, {ccf_physical[1]:.3f}, {ccf_physical[2]:.3f}) mm")
             
             # Convert back to voxel coordinates
             x_ccf = int(round(ccf_physical[0] / self.spacing))
             y_ccf = int(round(ccf_physical[1] / self.spacing))
             z_ccf = int(round(ccf_physical[2] / self.spacing))
             
-            print(f"  ✓ Final CCF voxel: ({z_ccf},{y_ccf},{x_ccf})")
+            if self.debug:
+                print(f"  ✓ Final CCF voxel: ({z_ccf},{y_ccf},{x_ccf})")
             
             return (z_ccf, y_ccf, x_ccf)
             
@@ -416,24 +862,45 @@ class FiberTracker:
                 'ccf_coords': None
             }
         
-        print(f"\n  === REGION LOOKUP DEBUG ===")
-        print(f"  Input (microCT space): ({z}, {y}, {x})")
-        print(f"  MicroCT image shape: {self.image.shape}")
+        if self.debug:
+            print(f"\n  === REGION LOOKUP DEBUG ===")
+            print(f"  Input (microCT space): ({z}, {y}, {x})")
+            print(f"  MicroCT image shape: {self.image.shape}")
         
         # Transform to CCF space
         z_ccf, y_ccf, x_ccf = self.transform_point_to_ccf(z, y, x)
         
+        return self.lookup_ccf_voxel(z_ccf, y_ccf, x_ccf)
+    
+    def lookup_ccf_voxel(self, z_ccf, y_ccf, x_ccf):
+        """Region info for a CCF voxel, cached per voxel (the cache resets with the annotation)"""
+        key = (z_ccf, y_ccf, x_ccf)
+        cached = self.voxel_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        region = self._lookup_ccf_voxel_uncached(z_ccf, y_ccf, x_ccf)
+        if region['acronym'] != 'ERR':
+            if len(self.voxel_cache) >= VOXEL_CACHE_SIZE:
+                self.voxel_cache.clear()
+            self.voxel_cache[key] = region
+        return dict(region)
+    
+    def _lookup_ccf_voxel_uncached(self, z_ccf, y_ccf, x_ccf):
+        """Bounds-check a CCF voxel and resolve its region from the annotation and ontology"""
         # Validate bounds
         ccf_shape = self.ccf_annotation.shape
-        print(f"  CCF annotation shape: {ccf_shape}")
-        print(f"  Checking bounds...")
+        if self.debug:
+            print(f"  CCF annotation shape: {ccf_shape}")
+            print(f"  Checking bounds...")
         
         if (z_ccf < 0 or z_ccf >= ccf_shape[0] or 
             y_ccf < 0 or y_ccf >= ccf_shape[1] or 
             x_ccf < 0 or x_ccf >= ccf_shape[2]):
-            print(f"  ❌ OUT OF BOUNDS!")
-            print(f"     CCF coords: ({z_ccf}, {y_ccf}, {x_ccf})")
-            print(f"     CCF shape:  {ccf_shape}")
+            if self.debug:
+                print(f"  ❌ OUT OF BOUNDS!")
+                print(f"     CCF coords: ({z_ccf}, {y_ccf}, {x_ccf})")
+                print(f"     CCF shape:  {ccf_shape}")
             return {
                 'id': -1,
                 'name': 'Out of Bounds',
@@ -442,15 +909,18 @@ class FiberTracker:
                 'ccf_coords': (z_ccf, y_ccf, x_ccf)
             }
         
-        print(f"  ✓ Within bounds")
+        if self.debug:
+            print(f"  ✓ Within bounds")
         
         try:
             # Look up region ID in annotation
             region_id = int(self.ccf_annotation[z_ccf, y_ccf, x_ccf])
-            print(f"  Region ID from annotation: {region_id}")
+            if self.debug:
+                print(f"  Region ID from annotation: {region_id}")
             
             if region_id == 0:
-                print(f"  ⚠️  Region ID is 0 (outside brain or background)")
+                if self.debug:
+                    print(f"  ⚠️  Region ID is 0 (outside brain or background)")
                 return {
                     'id': 0,
                     'name': 'Outside Brain',
@@ -463,8 +933,9 @@ class FiberTracker:
             region_info = self.ontology.get_region_info(region_id)
             hierarchy = self.ontology.get_region_hierarchy(region_id)
             
-            print(f"  ✓ Region found: {region_info['name']} ({region_info['acronym']})")
-            print(f"  === END DEBUG ===\n")
+            if self.debug:
+                print(f"  ✓ Region found: {region_info['name']} ({region_info['acronym']})")
+                print(f"  === END DEBUG ===\n")
             
             return {
                 'id': region_id,
@@ -479,7 +950,8 @@ class FiberTracker:
             print(f"  ❌ ERROR: {e}")
             import traceback
             traceback.print_exc()
-            print(f"  === END DEBUG ===\n")
+            if self.debug:
+                print(f"  === END DEBUG ===\n")
             return {
                 'id': -1,
                 'name': 'Error',
@@ -488,6 +960,70 @@ class FiberTracker:
                 'ccf_coords': (z_ccf, y_ccf, x_ccf)
             }
     
+    def transform_points_to_ccf(self, points_zyx):
+        """Transform an (N, 3) array of microCT (z, y, x) points to integer CCF voxels"""
+        points_zyx = np.asarray(points_zyx, dtype=np.float64)
+        if self.use_registered or self.transform is None:
+            # Registered image (or no transform): direct 1:1 mapping
+            return np.rint(points_zyx).astype(np.int64)
+        
+        # SimpleITK works in physical (x, y, z) coordinates
+        physical_xyz = points_zyx[:, ::-1] * self.spacing
+        ccf_xyz = self.apply_transform_bulk(physical_xyz)
+        return np.rint(ccf_xyz[:, ::-1] / self.spacing).astype(np.int64)
+    
+    def get_regions_along_fiber(self, top, bottom, n=200):
+        """Sample brain regions at n evenly spaced points from fiber top to bottom
+        
+        Parameters:
+        -----------
+        top, bottom : tuple
+            (z, y, x) fiber endpoints in microCT space
+        n : int
+            Number of sample points, including both endpoints
+            
+        Returns:
+        --------
+        dict : 'points' (n, 3) microCT coordinates, 'ccf_coords' (n, 3) CCF voxels,
+               'region_ids' (-1 out of bounds), 'names' and 'acronyms' per sample
+        """
+        t = np.linspace(0, 1, n, dtype=np.float32)[:, None]
+        top = np.asarray(top, dtype=np.float32)
+        bottom = np.asarray(bottom, dtype=np.float32)
+        points = top + t * (bottom - top)
+        
+        names = np.full(n, 'Out of Bounds', dtype=object)
+        acronyms = np.full(n, 'OOB', dtype=object)
+        
+        direct = self.use_registered or self.transform is None
+        if NUMBA_AVAILABLE and self.ccf_annotation is not None and (direct or self.transform_affine is not None):
+            # Transform, bounds check and annotation read fused in one compiled loop
+            A, t = (np.eye(3), np.zeros(3)) if direct else self.transform_affine
+            ccf_coords = np.empty((n, 3), dtype=np.int64)
+            region_ids = np.empty(n, dtype=np.int64)
+            _sample_annotation(points.astype(np.float64), A, t, float(self.spacing),
+                               np.asarray(self.ccf_annotation), ccf_coords, region_ids)
+            inside = region_ids >= 0
+            _, names[inside], acronyms[inside] = self.ontology.get_regions_bulk(region_ids[inside])
+        else:
+            ccf_coords = self.transform_points_to_ccf(points)
+            region_ids = np.full(n, -1, dtype=np.int64)
+            
+            if self.ccf_annotation is not None:
+                inside = np.all((ccf_coords >= 0) & (ccf_coords < self.ccf_annotation.shape), axis=1)
+                z_idx, y_idx, x_idx = ccf_coords[inside].T
+                # One fancy-indexing pass over the annotation for all samples
+                region_ids[inside] = self.ccf_annotation[z_idx, y_idx, x_idx]
+                _, names[inside], acronyms[inside] = self.ontology.get_regions_bulk(region_ids[inside])
+        
+        return {
+            'points': points,
+            'ccf_coords': ccf_coords,
+            'region_ids': region_ids,
+            'names': names,
+            'acronyms': acronyms
+        }
+    
     def start(self):
         """Start interactive session"""
         print("\n" + "="*70)
@@ -514,17 +1050,22 @@ class FiberTracker:
         self.fig = plt.figure(figsize=(16, 10))
         self.ax = plt.axes([0.1, 0.3, 0.8, 0.6])
         
+        # Fixed extent keeps data coordinates in full-resolution voxels
+        # whichever pyramid level is displayed
         self.im = self.ax.imshow(self.image[self.current_slice, :, :], 
-                                  cmap='gray', origin='upper')
+                                  cmap='gray', origin='upper',
+                                  extent=(-0.5, self.nx - 0.5, self.ny - 0.5, -0.5))
         self.update_title()
         self.ax.set_xlabel('X')
         self.ax.set_ylabel('Y')
         
-        plt.colorbar(self.im, ax=self.ax, fraction=0.046)
+        self.colorbar = plt.colorbar(self.im, ax=self.ax, fraction=0.046)
         
         ax_slider = plt.axes([0.2, 0.20, 0.6, 0.03])
         self.slice_slider = Slider(ax_slider, 'Slice (Z)', 0, self.nz-1, 
                                    valinit=self.current_slice, valstep=1)
+        # Slice changes are blitted by update_slice rather than redrawn
+        self.slice_slider.drawon = False
         self.slice_slider.on_changed(self.update_slice)
         
         ax_next = plt.axes([0.10, 0.10, 0.12, 0.05])
@@ -551,12 +1092,97 @@ class FiberTracker:
                                      ha='center', va='center', fontsize=10,
                                      bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
+        self.create_fiber_artists()
+        # Artists that change on clicks are drawn separately from the
+        # cached background, so marking points only repaints them
+        for artist in self.get_dynamic_artists():
+            artist.set_animated(True)
+        
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
         self.fig.canvas.mpl_connect('button_press_event', self.on_click)
         self.fig.canvas.mpl_connect('scroll_event', self.on_scroll)
+        self.ax.callbacks.connect('xlim_changed', self.on_view_changed)
+        self.ax.callbacks.connect('ylim_changed', self.on_view_changed)
         
         self.redraw_all_fibers()
+        self.update_fiber_legend()
         plt.show()
     
+    def create_fiber_artists(self):
+        """Create the persistent artists that show saved and in-progress fibers"""
+        empty = np.empty((0, 2))
+        saved_style = dict(s=144, edgecolors='white', linewidths=2, zorder=3)
+        # Tops (circles) and bottoms (squares) share one collection, with a
+        # marker path per point
+        for marker in ('o', 's'):
+            style = MarkerStyle(marker)
+            self.marker_paths[marker] = style.get_path().transformed(style.get_transform())
+        self.endpoint_scatter = self.ax.scatter(empty[:, 0], empty[:, 1], marker='o', **saved_style)
+        self.segment_lines = LineCollection([], linewidths=3, alpha=0.7, zorder=2)
+        self.ax.add_collection(self.segment_lines, autolim=False)
+        
+        self.current_top_marker = self.ax.scatter(empty[:, 0], empty[:, 1], marker='+', s=400,
+                                                  c='r', linewidths=3, zorder=4)
+        self.current_bottom_marker = self.ax.scatter(empty[:, 0], empty[:, 1], marker='x', s=400,
+                                                     c='b', linewidths=3, zorder=4)
+        self.current_line, = self.ax.plot([], [], linewidth=3, alpha=0.7, zorder=2)
+    
+    def fiber_color(self, fiber_id):
+        """RGBA colour for a fiber, derived from its ID rather than stored per fiber"""
+        return self.fiber_colors[fiber_id % len(self.fiber_colors)]
+    
+    def redraw_current_fiber(self):
+        """Update the markers for the fiber being marked"""
+        empty = np.empty((0, 2))
+        top, bottom = self.current_fiber['top'], self.current_fiber['bottom']
+        self.current_top_marker.set_offsets([[top[2], top[1]]] if top else empty)
+        self.current_bottom_marker.set_offsets([[bottom[2], bottom[1]]] if bottom else empty)
+        
+        if top and bottom and top[0] == bottom[0]:
+            self.current_line.set_data([top[2], bottom[2]], [top[1], bottom[1]])
+            self.current_line.set_color(self.fiber_color(len(self.fibers)))
+        else:
+            self.current_line.set_data([], [])
+    
+    def get_dynamic_artists(self):
+        """Artists redrawn on every interaction, in drawing order"""
+        return [self.im, self.segment_lines, self.endpoint_scatter,
+                self.current_line, self.current_top_marker, self.current_bottom_marker,
+                *([self.fiber_legend] if self.fiber_legend else []), self.ax.title, self.info_text,
+                self.colorbar.ax, self.slice_slider.ax]
+    
+    def draw_dynamic_artists(self):
+        """Draw the dynamic artists onto the canvas"""
+        for artist in self.get_dynamic_artists():
+            self.fig.draw_artist(artist)
+    
+    def on_draw(self, event):
+        """Cache the static background after a full draw, then paint the dynamic artists"""
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_dynamic_artists()
+    
+    def refresh_canvas(self):
+        """Request a repaint of the dynamic artists; requests made before it runs share one blit"""
+        canvas = self.fig.canvas
+        if self.background is None or not getattr(canvas, 'supports_blit', False):
+            canvas.draw_idle()
+            return
+        if self.refresh_timer is None:
+            self.refresh_timer = canvas.new_timer(interval=1)
+            self.refresh_timer.single_shot = True
+            self.refresh_timer.add_callback(self.blit_dynamic_artists)
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.refresh_timer.start()
+    
+    def blit_dynamic_artists(self):
+        """Repaint only the dynamic artists over the cached background"""
+        self.refresh_pending = False
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        self.draw_dynamic_artists()
+        canvas.blit(self.fig.bbox)
+    
     def update_title(self):
         """Update title"""
         status = " | TOP marked" if self.current_fiber['top'] else ""
@@ -570,19 +1196,48 @@ class FiberTracker:
         else:
             return f"Fibers: {len(self.fibers)} | Click for FIBER BOTTOM (tip)"
     
+    def get_display_level(self):
+        """Coarsest pyramid level that still has a voxel per screen pixel in the current view"""
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        bbox = self.ax.bbox
+        ratio = min(abs(x1 - x0) / max(bbox.width, 1), abs(y1 - y0) / max(bbox.height, 1))
+        if ratio < 2:
+            return 0
+        return min(int(np.log2(ratio)), len(self.pyramid) - 1)
+    
+    def show_slice(self):
+        """Display the current slice at the pyramid level that suits the view"""
+        self.display_level = self.get_display_level()
+        slice_data = self.pyramid[self.display_level][self.current_slice]
+        self.im.set_data(slice_data)
+        
+        clim = self.get_slice_clim(self.current_slice)
+        if clim is not None:
+            self.im.set_clim(*clim)
+    
+    def get_slice_clim(self, z):
+        """1st/99th percentile of a slice's non-zero voxels (None if empty), computed once per slice"""
+        if z not in self.clim_cache:
+            slice_data = self.image[z]
+            nonzero = slice_data[slice_data > 0]
+            self.clim_cache[z] = tuple(np.percentile(nonzero, [1, 99])) if nonzero.size else None
+        return self.clim_cache[z]
+    
+    def on_view_changed(self, ax):
+        """Switch pyramid level when zooming changes how many voxels each pixel covers"""
+        if self.get_display_level() != self.display_level:
+            self.show_slice()
+            self.fig.canvas.draw_idle()
+    
     def update_slice(self, val):
         """Update slice"""
         self.current_slice = int(self.slice_slider.val)
-        self.im.set_data(self.image[self.current_slice, :, :])
-        
-        slice_data = self.image[self.current_slice, :, :]
-        if slice_data.max() > 0:
-            vmin, vmax = np.percentile(slice_data[slice_data > 0], [1, 99])
-            self.im.set_clim(vmin, vmax)
+        self.show_slice()
         
         self.update_title()
         self.redraw_all_fibers()
-        self.fig.canvas.draw_idle()
+        self.refresh_canvas()
     
     def on_scroll(self, event):
         """Handle scroll"""
@@ -614,19 +1269,19 @@ class FiberTracker:
             self.current_fiber['top'] = (z, y, x)
             print(f"\nFiber {len(self.fibers)}: TOP at ({z},{y},{x})")
             
-            marker = self.ax.plot(x, y, 'r+', markersize=20, markeredgewidth=3)[0]
-            self.current_points.append(marker)
+            self.redraw_current_fiber()
             
             self.update_title()
             self.info_text.set_text(self.get_info_text())
-            self.fig.canvas.draw_idle()
+            self.refresh_canvas()
             
         elif self.current_fiber['bottom'] is None:
             self.current_fiber['bottom'] = (z, y, x)
             print(f"Fiber {len(self.fibers)}: BOTTOM at ({z},{y},{x})")
             
             # Get region information with detailed debugging
-            print(f"\nDEBUG: Getting region for point ({z},{y},{x})...")
+            if self.debug:
+                print(f"\nDEBUG: Getting region for point ({z},{y},{x})...")
             region_info = self.get_region_at_point(z, y, x)
             self.current_fiber['region_info'] = region_info
             
@@ -638,21 +1293,11 @@ class FiberTracker:
             if region_info['hierarchy']:
                 print(f"    Path: {' > '.join(region_info['hierarchy'][:3])}")
             
-            marker = self.ax.plot(x, y, 'bx', markersize=20, markeredgewidth=3)[0]
-            self.current_points.append(marker)
-            
-            top = self.current_fiber['top']
-            fiber_id = len(self.fibers)
-            color = self.fiber_colors[fiber_id % len(self.fiber_colors)]
-            
-            if top[0] == z:
-                line = self.ax.plot([top[2], x], [top[1], y], 
-                           color=color, linewidth=3, alpha=0.7)[0]
-                self.current_points.append(line)
+            self.redraw_current_fiber()
             
             self.update_title()
             self.info_text.set_text(self.get_info_text())
-            self.fig.canvas.draw_idle()
+            self.refresh_canvas()
             
             print(f">>> Click 'Next Fiber' to save\n")
     
@@ -669,19 +1314,11 @@ class FiberTracker:
             print("Nothing to undo - no current fiber in progress")
             return
         
-        for marker in self.current_points:
-            marker.remove()
-        self.current_points.clear()
-        
-        if self.current_fiber['top']:
-            z, y, x = self.current_fiber['top']
-            if z == self.current_slice:
-                marker = self.ax.plot(x, y, 'r+', markersize=20, markeredgewidth=3)[0]
-                self.current_points.append(marker)
+        self.redraw_current_fiber()
         
         self.update_title()
         self.info_text.set_text(self.get_info_text())
-        self.fig.canvas.draw_idle()
+        self.refresh_canvas()
     
     def undo_last_fiber(self, event):
         """Undo the last saved fiber"""
@@ -689,12 +1326,20 @@ class FiberTracker:
             print("No saved fibers to undo")
             return
         
-        removed = self.fibers.pop()
-        print(f"UNDO LAST FIBER: Removed Fiber {removed['id']} ({removed.get('region_name', 'N/A')})")
+        removed = self.fibers.pop()  # fiber_coords is sliced by len(self.fibers)
+        self.fiber_region_names.pop()
+        self.fiber_acronyms.pop()
+        self.fiber_label_texts.pop()
+        self.fiber_hierarchy_texts.pop()
+        # The last row is always the last entry in its slice lists
+        self.fibers_by_top_z[removed['top'][0]].pop()
+        self.fibers_by_bottom_z[removed['bottom'][0]].pop()
+        print(f"UNDO LAST FIBER: Removed Fiber {removed['id']} ({removed['region_name']})")
         
         self.redraw_all_fibers()
+        self.update_fiber_legend()
         self.update_title()
-        self.fig.canvas.draw_idle()
+        self.refresh_canvas()
     
     def next_fiber(self, event):
         """Save fiber"""
@@ -711,7 +1356,6 @@ class FiberTracker:
             'id': len(self.fibers),
             'top': self.current_fiber['top'],
             'bottom': self.current_fiber['bottom'],
-            'color': self.fiber_colors[len(self.fibers) % len(self.fiber_colors)].tolist(),
             'region_id': region_info['id'],
             'region_name': region_info['name'],
             'region_acronym': region_info['acronym'],
@@ -719,51 +1363,84 @@ class FiberTracker:
             'ccf_coords': region_info.get('ccf_coords')
         }
         
-        self.fibers.append(fiber_data)
+        self.add_fiber(fiber_data)
         print(f">>> Fiber {fiber_data['id']} SAVED: {region_info['name']}\n")
         
-        for marker in self.current_points:
-            marker.remove()
-        self.current_points.clear()
-        
         self.current_fiber = {'top': None, 'bottom': None}
+        self.redraw_current_fiber()
         self.redraw_all_fibers()
+        self.update_fiber_legend()
         self.update_title()
         self.info_text.set_text(self.get_info_text())
-        self.fig.canvas.draw_idle()
+        self.refresh_canvas()
+    
+    def add_fiber(self, fiber):
+        """Append a fiber dict and record its endpoints and region in the parallel arrays"""
+        # Fill missing region fields once so readers can index directly
+        fiber.setdefault('region_id', None)
+        fiber.setdefault('region_name', 'N/A')
+        fiber.setdefault('region_acronym', 'N/A')
+        fiber.setdefault('region_hierarchy', [])
+        fiber.setdefault('ccf_coords', None)
+        
+        n = len(self.fibers)
+        if n == len(self.fiber_coords):
+            grown = np.empty(2 * n, dtype=FIBER_DTYPE)
+            grown[:n] = self.fiber_coords
+            self.fiber_coords = grown
+        self.fiber_coords[n] = (fiber['id'], fiber['top'], fiber['bottom'])
+        self.fiber_region_names.append(fiber['region_name'])
+        self.fiber_acronyms.append(fiber['region_acronym'])
+        acronym = fiber['region_acronym']
+        label = f"F{fiber['id']}"
+        if acronym and acronym != 'N/A':
+            label += f" {acronym}"
+        self.fiber_label_texts.append(label)
+        self.fiber_hierarchy_texts.append(' > '.join(fiber['region_hierarchy'][:5]))
+        self.fibers_by_top_z[fiber['top'][0]].append(n)
+        self.fibers_by_bottom_z[fiber['bottom'][0]].append(n)
+        self.fibers.append(fiber)
+    
+    def redraw_all_fibers(self, force=False):
+        """Redraw fibers, unless the slice and fiber set are unchanged since the last call (or `force`)"""
+        state = (self.current_slice, len(self.fibers))
+        if state == self.rendered_fiber_state and not force:
+            return
+        self.rendered_fiber_state = state
+        
+        # Rows of the fibers with an endpoint on this slice, from the slice index
+        coords = self.fiber_coords[:len(self.fibers)]
+        tops, bottoms = coords['top'], coords['bottom']
+        colors = self.fiber_colors[coords['id'] % len(self.fiber_colors)]
+        top_rows = np.array(self.fibers_by_top_z.get(self.current_slice, ()), dtype=np.intp)
+        bottom_rows = np.array(self.fibers_by_bottom_z.get(self.current_slice, ()), dtype=np.intp)
+        both_rows = top_rows[bottoms[top_rows, 0] == self.current_slice]
+        
+        # Update the persistent collections in place instead of adding an
+        # artist per marker; offsets are (x, y)
+        self.endpoint_scatter.set_offsets(
+            np.concatenate([tops[top_rows][:, [2, 1]], bottoms[bottom_rows][:, [2, 1]]]))
+        self.endpoint_scatter.set_paths(
+            [self.marker_paths['o']] * len(top_rows) + [self.marker_paths['s']] * len(bottom_rows))
+        self.endpoint_scatter.set_facecolor(np.concatenate([colors[top_rows], colors[bottom_rows]]))
+        self.segment_lines.set_segments(
+            np.stack([tops[both_rows][:, [2, 1]], bottoms[both_rows][:, [2, 1]]], axis=1))
+        self.segment_lines.set_color(colors[both_rows])
     
-    def redraw_all_fibers(self):
-        """Redraw fibers"""
-        for artist in self.ax.lines[:]:
-            if artist not in self.current_points:
-                artist.remove()
-        for artist in self.ax.texts[:]:
-            artist.remove()
+    def update_fiber_legend(self):
+        """Rebuild the legend naming each saved fiber and its region"""
+        if self.fiber_legend is not None:
+            self.fiber_legend.remove()
+            self.fiber_legend = None
+        if not self.fibers:
+            return
         
-        for fiber in self.fibers:
-            color = fiber['color']
-            top, bottom = fiber['top'], fiber['bottom']
-            
-            if top[0] == self.current_slice:
-                self.ax.plot(top[2], top[1], 'o', color=color, markersize=12,
-                           markeredgecolor='white', markeredgewidth=2)
-            
-            if bottom[0] == self.current_slice:
-                self.ax.plot(bottom[2], bottom[1], 's', color=color, markersize=12,
-                           markeredgecolor='white', markeredgewidth=2)
-                
-                acronym = fiber.get('region_acronym', '')
-                label = f"F{fiber['id']}"
-                if acronym and acronym != 'N/A':
-                    label += f"\n{acronym}"
-                
-                self.ax.text(bottom[2]+5, bottom[1]+5, label, 
-                           color='white', fontsize=8, fontweight='bold',
-                           bbox=dict(boxstyle='round', facecolor=color, alpha=0.8))
-            
-            if top[0] == self.current_slice and bottom[0] == self.current_slice:
-                self.ax.plot([top[2], bottom[2]], [top[1], bottom[1]], 
-                           color=color, linewidth=3, alpha=0.7)
+        handles = [Line2D([], [], marker='s', linestyle='', markersize=8,
+                          color=self.fiber_color(fiber['id']), label=label)
+                   for fiber, label in zip(self.fibers, self.fiber_label_texts)]
+        self.fiber_legend = self.ax.legend(handles=handles, loc='upper right', fontsize=8,
+                                           ncol=1 + (len(handles) - 1) // 20, framealpha=0.8)
+        self.fiber_legend.set_animated(True)
     
     def save_progress(self, event):
         """Save progress"""
@@ -771,8 +1448,19 @@ class FiberTracker:
             print("No fibers yet")
             return
         
-        progress_file = self.output_dir / 'fiber_tracking_progress.json'
-        self.save_fiber_data(progress_file)
+        # Fibers are only appended or popped, so their endpoints and regions
+        # identify what a save would contain
+        signature = hash((self.fiber_coords[:len(self.fibers)].tobytes(),
+                          tuple(self.fiber_region_names)))
+        if signature == self.last_save_signature:
+            print(f">>> Progress unchanged since last save ({len(self.fibers)} fibers)")
+            return
+        
+        if PYARROW_AVAILABLE:
+            self.save_fiber_table(self.output_dir / 'fiber_tracking_progress.feather')
+        else:
+            self.save_fiber_data(self.output_dir / 'fiber_tracking_progress.json')
+        self.last_save_signature = signature
         print(f">>> Progress saved ({len(self.fibers)} fibers)")
     
     def finish_tracking(self, event):
@@ -791,7 +1479,7 @@ class FiberTracker:
         print("GENERATING OUTPUTS...")
         print("="*70)
         
-        self.save_fiber_data(self.output_dir / 'fiber_data.json')
+        self.save_fiber_data(self.output_dir / 'fiber_data.json', pretty=True)
         self.generate_fiber_report(self.output_dir / 'fiber_report.csv')
         self.generate_summary_report(self.output_dir / 'fiber_summary.txt')
         self.generate_horizontal_view(self.output_dir / 'fiber_horizontal_view.png')
@@ -806,8 +1494,8 @@ class FiberTracker:
         
         plt.close(self.fig)
     
-    def save_fiber_data(self, output_path):
-        """Save to JSON"""
+    def get_fiber_records(self):
+        """Fibers as flat dicts, the layout of the saved JSON/Feather files"""
         fiber_list = []
         for fiber in self.fibers:
             fiber_list.append({
@@ -818,77 +1506,104 @@ class FiberTracker:
                 'bottom_z': fiber['bottom'][0],
                 'bottom_y': fiber['bottom'][1],
                 'bottom_x': fiber['bottom'][2],
-                'region_id': fiber.get('region_id'),
-                'region_name': fiber.get('region_name', 'N/A'),
-                'region_acronym': fiber.get('region_acronym', 'N/A'),
-                'region_hierarchy': fiber.get('region_hierarchy', []),
-                'ccf_coords': fiber.get('ccf_coords')
+                'region_id': fiber['region_id'],
+                'region_name': fiber['region_name'],
+                'region_acronym': fiber['region_acronym'],
+                'region_hierarchy': fiber['region_hierarchy'],
+                'ccf_coords': fiber['ccf_coords']
             })
+        return fiber_list
+    
+    def save_fiber_data(self, output_path, pretty=False):
+        """Save to JSON, compact unless `pretty` (indented, for files meant to be read)"""
+        fiber_list = self.get_fiber_records()
         
-        with open(output_path, 'w') as f:
-            json.dump(fiber_list, f, indent=2)
+        # Serialize to one string and write it once; json.dump writes piecemeal
+        if pretty:
+            text = json.dumps(fiber_list, indent=2)
+        else:
+            text = json.dumps(fiber_list, separators=(',', ':'))
+        # Write beside the target and rename, so a crash never leaves a partial file
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        tmp_path.replace(output_path)
+        print(f">>> Saved: {output_path}")
+    
+    def save_fiber_table(self, output_path):
+        """Save to LZ4-compressed Feather (requires pyarrow); hierarchy becomes a list column"""
+        table = pa.Table.from_pylist(self.get_fiber_records())
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        feather.write_feather(table, str(tmp_path), compression='lz4')
+        tmp_path.replace(output_path)
         print(f">>> Saved: {output_path}")
     
     def generate_fiber_report(self, output_path):
         """Generate CSV"""
-        data = []
-        for fiber in self.fibers:
-            hierarchy = fiber.get('region_hierarchy', [])
-            ccf_coords = fiber.get('ccf_coords')
-            
-            data.append({
-                'Fiber_ID': fiber['id'],
-                'Top_Z': fiber['top'][0],
-                'Top_Y': fiber['top'][1],
-                'Top_X': fiber['top'][2],
-                'Bottom_Z': fiber['bottom'][0],
-                'Bottom_Y': fiber['bottom'][1],
-                'Bottom_X': fiber['bottom'][2],
-                'CCF_Z': ccf_coords[0] if ccf_coords else 'N/A',
-                'CCF_Y': ccf_coords[1] if ccf_coords else 'N/A',
-                'CCF_X': ccf_coords[2] if ccf_coords else 'N/A',
-                'Region_ID': fiber.get('region_id', 'N/A'),
-                'Region_Name': fiber.get('region_name', 'N/A'),
-                'Region_Acronym': fiber.get('region_acronym', 'N/A'),
-                'Parent_Region': hierarchy[1] if len(hierarchy) > 1 else 'N/A',
-                'Grandparent_Region': hierarchy[2] if len(hierarchy) > 2 else 'N/A'
-            })
-        
-        pd.DataFrame(data).to_csv(output_path, index=False)
+        header = ['Fiber_ID', 'Top_Z', 'Top_Y', 'Top_X', 'Bottom_Z', 'Bottom_Y', 'Bottom_X',
+                  'CCF_Z', 'CCF_Y', 'CCF_X', 'Region_ID', 'Region_Name', 'Region_Acronym',
+                  'Parent_Region', 'Grandparent_Region']
+        
+        # Integer ID/endpoint columns, formatted column-wise from fiber_coords
+        coords = self.fiber_coords[:len(self.fibers)]
+        columns = [coords['id'], *coords['top'].T, *coords['bottom'].T]
+        row_strs = np.char.mod('%d', columns[0])
+        for column in columns[1:]:
+            row_strs = np.char.add(np.char.add(row_strs, ','), np.char.mod('%d', column))
+        
+        # Remaining columns hold text that may need CSV quoting
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerows(
+            [*(fiber['ccf_coords'] or ('N/A', 'N/A', 'N/A')),
+             fiber['region_id'],
+             fiber['region_name'],
+             fiber['region_acronym'],
+             *(list(fiber['region_hierarchy'][1:3]) + ['N/A', 'N/A'])[:2]]
+            for fiber in self.fibers
+        )
+        rest_strs = np.array(buf.getvalue().split('\n')[:-1], dtype=str)
+        if len(rest_strs):
+            row_strs = np.char.add(np.char.add(row_strs, ','), rest_strs)
+        
+        with open(output_path, 'w', newline='') as f:
+            f.write(','.join(header) + '\n' + ''.join(line + '\n' for line in row_strs.tolist()))
         print(f">>> Saved: {output_path}")
     
     def generate_summary_report(self, output_path):
         """Generate summary"""
+        # Assemble the whole report in memory and write it in one call
+        buf = io.StringIO()
+        buf.write("="*70 + "\n")
+        buf.write("FIBER TRACKING SUMMARY\n")
+        buf.write("="*70 + "\n\n")
+        buf.write(f"Total Fibers: {len(self.fibers)}\n\n")
+        
+        region_groups = defaultdict(list)
+        for fiber, region in zip(self.fibers, self.fiber_region_names):
+            region_groups[region].append(fiber['id'])
+        
+        buf.write("FIBERS BY REGION:\n" + "-"*70 + "\n")
+        for region, fiber_ids in sorted(region_groups.items()):
+            buf.write(f"{region}: {len(fiber_ids)} fiber(s)\n")
+            buf.write(''.join(f"  - Fiber {fid}\n" for fid in fiber_ids))
+            buf.write("\n")
+        
+        buf.write("DETAILS:\n" + "-"*70 + "\n")
+        for fiber, hierarchy_text in zip(self.fibers, self.fiber_hierarchy_texts):
+            buf.write(f"\nFiber {fiber['id']}:\n")
+            buf.write(f"  TOP: {fiber['top']}\n")
+            buf.write(f"  BOTTOM: {fiber['bottom']}\n")
+            if fiber['ccf_coords']:
+                buf.write(f"  CCF: {fiber['ccf_coords']}\n")
+            buf.write(f"  Region: {fiber['region_name']}\n")
+            buf.write(f"  Acronym: {fiber['region_acronym']}\n")
+            if hierarchy_text:
+                buf.write(f"  Hierarchy: {hierarchy_text}\n")
+        
         with open(output_path, 'w') as f:
-            f.write("="*70 + "\n")
-            f.write("FIBER TRACKING SUMMARY\n")
-            f.write("="*70 + "\n\n")
-            f.write(f"Total Fibers: {len(self.fibers)}\n\n")
-            
-            region_groups = {}
-            for fiber in self.fibers:
-                region = fiber.get('region_name', 'N/A')
-                region_groups.setdefault(region, []).append(fiber)
-            
-            f.write("FIBERS BY REGION:\n" + "-"*70 + "\n")
-            for region, fibers in sorted(region_groups.items()):
-                f.write(f"{region}: {len(fibers)} fiber(s)\n")
-                for fiber in fibers:
-                    f.write(f"  - Fiber {fiber['id']}\n")
-                f.write("\n")
-            
-            f.write("DETAILS:\n" + "-"*70 + "\n")
-            for fiber in self.fibers:
-                f.write(f"\nFiber {fiber['id']}:\n")
-                f.write(f"  TOP: {fiber['top']}\n")
-                f.write(f"  BOTTOM: {fiber['bottom']}\n")
-                if fiber.get('ccf_coords'):
-                    f.write(f"  CCF: {fiber['ccf_coords']}\n")
-                f.write(f"  Region: {fiber.get('region_name', 'N/A')}\n")
-                f.write(f"  Acronym: {fiber.get('region_acronym', 'N/A')}\n")
-                hierarchy = fiber.get('region_hierarchy', [])
-                if hierarchy:
-                    f.write(f"  Hierarchy: {' > '.join(hierarchy[:5])}\n")
+            f.write(buf.getvalue())
         
         print(f">>> Saved: {output_path}")
     
@@ -897,20 +1612,24 @@ class FiberTracker:
         if len(self.fibers) == 0:
             return
         
-        # Find middle Y coordinate based on fiber locations
-        all_y_coords = []
-        for fiber in self.fibers:
-            all_y_coords.append(fiber['top'][1])
-            all_y_coords.append(fiber['bottom'][1])
+        coords = self.fiber_coords[:len(self.fibers)]
+        tops, bottoms = coords['top'], coords['bottom']
         
-        min_y = min(all_y_coords)
-        max_y = max(all_y_coords)
+        # Find middle Y coordinate based on fiber locations
+        min_y = int(min(tops[:, 1].min(), bottoms[:, 1].min()))
+        max_y = int(max(tops[:, 1].max(), bottoms[:, 1].max()))
         middle_y = (min_y + max_y) // 2
         
         print(f"Horizontal view: Y={middle_y} (range {min_y}-{max_y})")
         
-        # Get coronal slice (constant Y, showing X-Z plane)
-        coronal_slice = self.image[:, middle_y, :]
+        # Get coronal slice (constant Y, showing X-Z plane), cropped to the
+        # fibers' Z/X bounding box plus a margin
+        endpoints = np.concatenate([tops, bottoms])
+        z_min = max(0, int(endpoints[:, 0].min()) - HORIZONTAL_VIEW_PAD)
+        z_max = min(self.nz, int(endpoints[:, 0].max()) + HORIZONTAL_VIEW_PAD + 1)
+        x_min = max(0, int(endpoints[:, 2].min()) - HORIZONTAL_VIEW_PAD)
+        x_max = min(self.nx, int(endpoints[:, 2].max()) + HORIZONTAL_VIEW_PAD + 1)
+        coronal_slice = self.image[z_min:z_max, middle_y, x_min:x_max]
         
         # Calculate proper figure size to maintain aspect ratio
         # Image is (Z, X), so height/width ratio
@@ -923,48 +1642,38 @@ class FiberTracker:
         
         fig, ax = plt.subplots(figsize=(fig_width, fig_height))
         
-        # Display with correct aspect ratio
-        ax.imshow(coronal_slice, cmap='gray', origin='lower', aspect='equal')
+        # Display with correct aspect ratio; the extent keeps full-volume
+        # coordinates so markers are plotted unchanged
+        ax.imshow(coronal_slice, cmap='gray', origin='lower', aspect='equal',
+                  extent=(x_min - 0.5, x_max - 0.5, z_min - 0.5, z_max - 0.5))
         ax.set_title(f'Fiber Locations - Coronal View (Y={middle_y})', 
                     fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('X (Medial-Lateral)', fontsize=12)
         ax.set_ylabel('Z (Dorsal-Ventral)', fontsize=12)
         
+        # Fibers passing through this Y slice, interpolated there all at once
+        dy = bottoms[:, 1] - tops[:, 1]
+        crossing = (np.minimum(tops[:, 1], bottoms[:, 1]) <= middle_y) & \
+                   (middle_y <= np.maximum(tops[:, 1], bottoms[:, 1]))
+        t = np.divide(middle_y - tops[:, 1], dy, out=np.zeros(len(dy)), where=dy != 0)
+        zs = (tops[:, 0] + t * (bottoms[:, 0] - tops[:, 0])).astype(int)
+        xs = (tops[:, 2] + t * (bottoms[:, 2] - tops[:, 2])).astype(int)
+        
+        # Plot markers ONLY - no labels near markers
+        rows = np.flatnonzero(crossing)
+        ax.scatter(xs[rows], zs[rows], s=64, c=self.fiber_colors[coords['id'][rows] % len(self.fiber_colors)],
+                   edgecolors='white', linewidths=1.5, zorder=10)
+        
         # Collect unique regions for legend
         region_summary = {}
-        
-        for fiber in self.fibers:
-            color = fiber['color']
-            top = fiber['top']
-            bottom = fiber['bottom']
-            
-            y_min = min(top[1], bottom[1])
-            y_max = max(top[1], bottom[1])
-            
-            # Check if fiber passes through this Y slice
-            if y_min <= middle_y <= y_max:
-                # Interpolate position at this Y slice
-                if bottom[1] != top[1]:
-                    t = (middle_y - top[1]) / (bottom[1] - top[1])
-                else:
-                    t = 0
-                
-                z = int(top[0] + t * (bottom[0] - top[0]))
-                x = int(top[2] + t * (bottom[2] - top[2]))
-                
-                # Plot marker ONLY - no labels near markers
-                ax.plot(x, z, 'o', color=color, markersize=8, 
-                       markeredgecolor='white', markeredgewidth=1.5, zorder=10)
-                
-                # Track regions for summary
-                region_name = fiber.get('region_name', 'N/A')
-                acronym = fiber.get('region_acronym', 'N/A')
-                if region_name not in region_summary:
-                    region_summary[region_name] = {
-                        'acronym': acronym,
-                        'fibers': []
-                    }
-                region_summary[region_name]['fibers'].append(fiber['id'])
+        for row in rows:
+            region_name = self.fiber_region_names[row]
+            if region_name not in region_summary:
+                region_summary[region_name] = {
+                    'acronym': self.fiber_acronyms[row],
+                    'fibers': []
+                }
+            region_summary[region_name]['fibers'].append(coords['id'][row])
         
         # Add region summary in top-right corner
         if region_summary:
@@ -991,54 +1700,77 @@ class FiberTracker:
         print(f">>> Saved: {output_path}")
         plt.close()
     
+    def get_ccf_label_cmap(self):
+        """Colormap with one nipy_spectral color per label present in the annotation"""
+        if self.ccf_labels is None:
+            # Slice by slice, so a memory-mapped volume is never copied whole
+            self.ccf_labels = np.unique(np.concatenate(
+                [np.unique(self.ccf_annotation[z]) for z in range(self.ccf_annotation.shape[0])]))
+            self.ccf_label_cmap = ListedColormap(
+                plt.cm.nipy_spectral(np.linspace(0, 1, len(self.ccf_labels))))
+        return self.ccf_label_cmap
+    
+    def get_ccf_overlay_index(self, slice_z):
+        """Downsampled annotation slice as uint8/uint16 indices into get_ccf_label_cmap(), cached"""
+        if slice_z not in self.ccf_index_cache:
+            self.get_ccf_label_cmap()
+            labels = self.ccf_annotation[slice_z, ::CCF_OVERLAY_STRIDE, ::CCF_OVERLAY_STRIDE]
+            dtype = np.uint8 if len(self.ccf_labels) <= 256 else np.uint16
+            self.ccf_index_cache[slice_z] = np.searchsorted(self.ccf_labels, labels).astype(dtype)
+        return self.ccf_index_cache[slice_z]
+    
     def generate_ccf_visualization(self, output_path):
-        """Generate CCF overlay - FIXED: Markers only, no labels"""
-        slice_fibers = {}
-        for fiber in self.fibers:
-            z = fiber['bottom'][0]
-            slice_fibers.setdefault(z, []).append(fiber)
+        """Generate CCF overlay - FIXED: Markers only, no labels
+        
+        Writes one image per slice with fiber tips, named like
+        `output_path` with a `_z<slice>` suffix, so only one slice is held
+        in the figure at a time.
+        """
+        output_path = Path(output_path)
+        coords = self.fiber_coords[:len(self.fibers)]
+        bottoms = coords['bottom']
+        colors = self.fiber_colors[coords['id'] % len(self.fiber_colors)]
+        
+        # Rows of the fibers whose tip is on each slice
+        slice_fibers = {z: rows for z, rows in self.fibers_by_bottom_z.items() if rows}
         
         num_slices = len(slice_fibers)
         if num_slices == 0:
             return
         
-        ncols = min(3, num_slices)
-        nrows = (num_slices + ncols - 1) // ncols
-        
-        fig, axes = plt.subplots(nrows, ncols, figsize=(7*ncols, 7*nrows))
-        if num_slices == 1:
-            axes = [axes]
-        else:
-            axes = axes.flatten()
+        # One figure reused for every slice; each is saved and cleared
+        fig, ax = plt.subplots(figsize=(7, 7))
         
-        for idx, (slice_z, fibers_in_slice) in enumerate(sorted(slice_fibers.items())):
-            ax = axes[idx]
+        for slice_z, rows in sorted(slice_fibers.items()):
+            ax.cla()
             
-            # Overlay CCF annotation and microCT
-            ax.imshow(self.ccf_annotation[slice_z, :, :], cmap='nipy_spectral', 
-                     alpha=0.5, origin='upper')
-            ax.imshow(self.image[slice_z, :, :], cmap='gray', alpha=0.5, origin='upper')
+            # Overlay CCF annotation and microCT, both downsampled; the extents
+            # keep data coordinates in full-resolution voxels for the markers
+            ccf_ny, ccf_nx = self.ccf_annotation.shape[1:]
+            ax.imshow(self.get_ccf_overlay_index(slice_z), cmap=self.get_ccf_label_cmap(),
+                      vmin=0, vmax=len(self.ccf_labels) - 1, interpolation='nearest',
+                      alpha=0.5, origin='upper', extent=(-0.5, ccf_nx - 0.5, ccf_ny - 0.5, -0.5))
+            ax.imshow(self.image[slice_z, ::CCF_OVERLAY_STRIDE, ::CCF_OVERLAY_STRIDE],
+                      cmap='gray', alpha=0.5, origin='upper',
+                      extent=(-0.5, self.nx - 0.5, self.ny - 0.5, -0.5))
+            
+            # Plot markers ONLY - no labels; one scatter for the whole slice
+            ax.scatter(bottoms[rows, 2], bottoms[rows, 1], s=100, c=colors[rows],
+                       edgecolors='white', linewidths=2, zorder=10)
             
             # Collect region information for this slice
             region_summary = {}
             
-            for fiber in fibers_in_slice:
-                y, x = fiber['bottom'][1], fiber['bottom'][2]
-                color = fiber['color']
-                region_name = fiber.get('region_name', 'N/A')
-                acronym = fiber.get('region_acronym', 'N/A')
-                
-                # Plot marker ONLY - no labels
-                ax.plot(x, y, 'o', color=color, markersize=10, 
-                       markeredgecolor='white', markeredgewidth=2, zorder=10)
+            for row in rows:
+                region_name = self.fiber_region_names[row]
                 
                 # Track for summary
                 if region_name not in region_summary:
                     region_summary[region_name] = {
-                        'acronym': acronym,
+                        'acronym': self.fiber_acronyms[row],
                         'fibers': []
                     }
-                region_summary[region_name]['fibers'].append(fiber['id'])
+                region_summary[region_name]['fibers'].append(coords['id'][row])
             
             # Add region summary in top-right
             if region_summary:
@@ -1064,19 +1796,25 @@ class FiberTracker:
             ax.set_title(f"Fiber Tips - Slice Z={slice_z}", 
                         fontsize=12, fontweight='bold', pad=10)
             ax.axis('off')
+            
+            slice_path = output_path.with_name(f"{output_path.stem}_z{slice_z}{output_path.suffix}")
+            fig.tight_layout()
+            fig.savefig(slice_path, dpi=150, bbox_inches='tight')
+            print(f">>> Saved: {slice_path}")
         
-        # Hide unused subplots
-        for idx in range(num_slices, len(axes)):
-            axes[idx].axis('off')
-        
-        plt.tight_layout()
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        print(f">>> Saved: {output_path}")
-        plt.close()
+        plt.close(fig)
 
 
-def download_ccf_annotation(output_dir, resolution=25):
-    """Download Allen CCF annotation"""
+# Bytes read per chunk when streaming the annotation download to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def download_ccf_annotation(output_dir, resolution=25, retries=5):
+    """Download Allen CCF annotation
+    
+    Streams to a `.part` file in 1 MB chunks and resumes it with an HTTP
+    Range request after an interruption, retrying with exponential backoff.
+    """
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
     
@@ -1091,16 +1829,57 @@ def download_ccf_annotation(output_dir, resolution=25):
     
     url = f"http://download.alleninstitute.org/informatics-archive/current-release/mouse_ccf/annotation/ccf_2017/annotation_{resolution}.nrrd"
     
-    try:
-        import urllib.request
-        urllib.request.urlretrieve(url, output_file)
-        print(f">>> Complete: {output_file}")
-        return str(output_file)
-    except Exception as e:
-        print(f"ERROR: {e}")
-        print(f"\nManual download: {url}")
-        print(f"Save to: {output_file}")
-        return None
+    import time
+    import urllib.error
+    import urllib.request
+    
+    partial_file = output_file.with_name(output_file.name + '.part')
+    error = None
+    for attempt in range(retries):
+        offset = partial_file.stat().st_size if partial_file.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        progress = None
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=60) as response, open(partial_file, 'ab') as f:
+                if offset and response.status != 206:
+                    # Server ignored the range; start over
+                    f.truncate(0)
+                    offset = 0
+                total = offset + response.length if response.length is not None else None
+                if TQDM_AVAILABLE:
+                    progress = tqdm(total=total, initial=offset, unit='B', unit_scale=True)
+                while True:
+                    chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    if progress is not None:
+                        progress.update(len(chunk))
+        except urllib.error.HTTPError as e:
+            if e.code != 416:  # 416: range starts at the end, already complete
+                error = e
+        except Exception as e:
+            error = e
+        finally:
+            if progress is not None:
+                progress.close()
+        
+        if error is None:
+            partial_file.replace(output_file)
+            print(f">>> Complete: {output_file}")
+            return str(output_file)
+        
+        if attempt < retries - 1:
+            delay = 2 ** attempt
+            print(f"Download interrupted ({error}); resuming in {delay}s...")
+            time.sleep(delay)
+            error = None
+    
+    print(f"ERROR: {error}")
+    print(f"\nManual download: {url}")
+    print(f"Save to: {output_file}")
+    return None
 
 
 def main():
@@ -17,16 +17,27 @@ import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, CheckButtons, RadioButtons
 import matplotlib.patches as mpatches
 from mpl_toolkits.mplot3d import Axes3D
-from mpl_toolkits.mplot3d.art3d import Line3D
+from mpl_toolkits.mplot3d.art3d import Line3D, Line3DCollection, Poly3DCollection
 import tifffile
 import json
 from pathlib import Path
 
 
+def load_tiff_volume(path):
+    """
+    Open a TIFF volume memory-mapped, so only the slices that are displayed
+    get paged in; compressed/tiled TIFFs can't be mapped and are read fully
+    """
+    try:
+        return tifffile.memmap(str(path), mode='r')
+    except ValueError:
+        return tifffile.imread(str(path))
+
+
 class FiberVisualizer3D:
     """Interactive 3D fiber visualization"""
     
-    def __init__(self, image_path, fiber_data_path, ccf_path=None):
+    def __init__(self, image_path, fiber_data_path, ccf_path=None, low_memory=False):
         """
         Initialize visualizer
         
@@ -38,6 +49,9 @@ class FiberVisualizer3D:
             Path to fiber_data.json
         ccf_path : str, optional
             Path to Allen CCF annotation or template
+        low_memory : bool
+            If True, scale only the displayed slices to uint8 instead of
+            keeping a uint8 copy of the whole volume
         """
         print("="*70)
         print("LOADING DATA FOR 3D VISUALIZATION")
@@ -45,7 +59,7 @@ class FiberVisualizer3D:
         
         # Load microCT image
         print(f"\nLoading microCT image: {image_path}")
-        self.microct_image = tifffile.imread(image_path)
+        self.microct_image = load_tiff_volume(image_path)
         self.nz, self.ny, self.nx = self.microct_image.shape
         print(f"✓ MicroCT shape: {self.microct_image.shape}")
         
@@ -58,7 +72,7 @@ class FiberVisualizer3D:
                     import nrrd
                     self.ccf_image, _ = nrrd.read(str(ccf_path))
                 else:
-                    self.ccf_image = tifffile.imread(ccf_path)
+                    self.ccf_image = load_tiff_volume(ccf_path)
                 print(f"✓ CCF shape: {self.ccf_image.shape}")
                 
                 if self.ccf_image.shape != self.microct_image.shape:
@@ -83,15 +97,23 @@ class FiberVisualizer3D:
         for fdata in fiber_list:
             fiber = {
                 'id': fdata['fiber_id'],
-                'top': np.array([fdata['top_z'], fdata['top_y'], fdata['top_x']]),
-                'bottom': np.array([fdata['bottom_z'], fdata['bottom_y'], fdata['bottom_x']]),
-                'color': self.fiber_colors[fdata['fiber_id'] % len(self.fiber_colors)],
                 'region_name': fdata.get('region_name', 'N/A'),
                 'region_acronym': fdata.get('region_acronym', 'N/A'),
-                'visible': True  # For toggling
             }
             self.fibers.append(fiber)
         
+        # Fiber geometry as parallel arrays (one row per entry in self.fibers)
+        # so drawing selects visible fibers with a mask instead of a Python loop
+        self.fiber_tops = np.array([[fdata['top_z'], fdata['top_y'], fdata['top_x']]
+                                    for fdata in fiber_list], dtype=np.float32).reshape(-1, 3)
+        self.fiber_bottoms = np.array([[fdata['bottom_z'], fdata['bottom_y'], fdata['bottom_x']]
+                                       for fdata in fiber_list], dtype=np.float32).reshape(-1, 3)
+        fiber_ids = np.array([fiber['id'] for fiber in self.fibers], dtype=int)
+        self.fiber_rgba = self.fiber_colors[fiber_ids % len(self.fiber_colors)]
+        self.fiber_visible = np.ones(len(self.fibers), dtype=bool)  # For toggling
+        # Fiber ID -> row in the arrays above, for checkbox lookups
+        self.fiber_index = {fiber['id']: i for i, fiber in enumerate(self.fibers)}
+        
         print(f"✓ Loaded {len(self.fibers)} fibers")
         
         # Current slice positions
@@ -111,157 +133,276 @@ class FiberVisualizer3D:
         # But we can adjust if needed
         self.aspect_ratio = (self.nx, self.ny, self.nz)
         
+        # Longest side, in quads, of a displayed slice mesh; larger slices are
+        # strided down to it. Every quad is a 3D polygon projected and
+        # depth-sorted on each draw, so this stays near plot_surface's old
+        # 50x50 cap (raise for higher-detail exports, at a draw-time cost)
+        self.display_detail = 64
+        
+        # Slice plane -> ((image mode, index, step), RGBA facecolors) of the last slice shown
+        self.slice_color_cache = {}
+        # Slice plane -> (step, quad vertices) of the slice mesh, moved in place
+        # when only the slice index changes
+        self.slice_verts = {}
+        # Image mode -> volume scaled to uint8, built on first display
+        self.display_volumes = {}
+        # Image mode -> uint8 scale factor (255 / volume max)
+        self.display_scales = {}
+        self.low_memory = low_memory
+        # Gray colormap as a 256-entry RGBA table, indexed by uint8 voxels
+        self.gray_lut = plt.cm.gray(np.arange(256)).astype(np.float32)
+        
         # Figure elements (will be created in start())
         self.fig = None
         self.ax_3d = None
         self.slice_artists = {}
-        self.fiber_lines = {}
+        self.fiber_artists = []
+        
+        # Slider redraws are debounced: planes moved since the last draw,
+        # flushed by a single-shot timer (created in start())
+        self.pending_slices = set()
+        self.slice_timer = None
         
         print("\n✓ Initialization complete!")
         print("="*70)
     
-    def create_fiber_line(self, fiber):
-        """Create 3D line for a fiber"""
-        top = fiber['top']
-        bottom = fiber['bottom']
-        
-        # Create line from top to bottom
-        line_x = [top[2], bottom[2]]  # X coordinates
-        line_y = [top[1], bottom[1]]  # Y coordinates
-        line_z = [top[0], bottom[0]]  # Z coordinates
-        
-        return line_x, line_y, line_z
-    
     def draw_fibers_3d(self):
-        """Draw all fibers in 3D view"""
-        # Remove existing fiber lines properly
-        for line_collection in list(self.fiber_lines.values()):
+        """Draw all visible fibers as one line collection plus one scatter per endpoint type"""
+        # Remove existing fiber artists properly
+        for artist in self.fiber_artists:
             try:
-                line_collection.remove()
+                artist.remove()
             except:
                 pass
-        self.fiber_lines.clear()
+        self.fiber_artists = []
         
-        # Draw each fiber
-        for fiber in self.fibers:
-            if not fiber['visible']:
-                continue
-            
-            line_x, line_y, line_z = self.create_fiber_line(fiber)
-            
-            # Draw line - returns a list, take first element
-            line = self.ax_3d.plot(line_x, line_y, line_z, 
-                                   color=fiber['color'], 
-                                   linewidth=3, 
-                                   alpha=0.8,
-                                   zorder=10)[0]
-            self.fiber_lines[fiber['id']] = line
-            
-            # Add markers at endpoints
-            top = fiber['top']
-            bottom = fiber['bottom']
-            
-            # Top marker (entry point)
-            self.ax_3d.scatter([top[2]], [top[1]], [top[0]], 
-                              color=fiber['color'], s=50, 
-                              marker='o', edgecolors='white', linewidths=1.5,
-                              zorder=11)
-            
-            # Bottom marker (tip)
-            self.ax_3d.scatter([bottom[2]], [bottom[1]], [bottom[0]], 
-                              color=fiber['color'], s=80, 
-                              marker='s', edgecolors='white', linewidths=1.5,
-                              zorder=11)
+        if not self.fiber_visible.any():
+            return
+        
+        # Endpoints of the visible fibers as (x, y, z) rows
+        tops = self.fiber_tops[self.fiber_visible, ::-1]
+        bottoms = self.fiber_bottoms[self.fiber_visible, ::-1]
+        colors = self.fiber_rgba[self.fiber_visible]
+        
+        lines = Line3DCollection(np.stack([tops, bottoms], axis=1), colors=colors,
+                                 linewidths=3, alpha=0.8, zorder=10)
+        self.ax_3d.add_collection3d(lines)
+        
+        # Top markers (entry points)
+        top_markers = self.ax_3d.scatter(tops[:, 0], tops[:, 1], tops[:, 2],
+                                         c=colors, s=50,
+                                         marker='o', edgecolors='white', linewidths=1.5,
+                                         zorder=11)
+        
+        # Bottom markers (tips)
+        bottom_markers = self.ax_3d.scatter(bottoms[:, 0], bottoms[:, 1], bottoms[:, 2],
+                                            c=colors, s=80,
+                                            marker='s', edgecolors='white', linewidths=1.5,
+                                            zorder=11)
+        
+        self.fiber_artists = [lines, top_markers, bottom_markers]
+    
+    def get_display_scale(self):
+        """Factor mapping the current image onto 0-255, computed once per image mode"""
+        if self.image_mode not in self.display_scales:
+            self.display_scales[self.image_mode] = 255.0 / (float(self.current_image.max()) + 1e-8)
+        return self.display_scales[self.image_mode]
+    
+    def to_display_uint8(self, data):
+        """Scale an array of the current image to uint8, clipping values outside 0-255"""
+        if data.dtype == np.uint8:
+            return data
+        scaled = data.astype(np.float32) * self.get_display_scale()
+        # Negative voxels (e.g. float registered volumes) would wrap in the cast
+        return np.clip(scaled, 0, 255, out=scaled).astype(np.uint8)
+    
+    def get_display_volume(self):
+        """Current image scaled to uint8 by its maximum, computed once per image mode"""
+        if self.image_mode not in self.display_volumes:
+            image = self.current_image
+            if image.dtype == np.uint8:
+                volume = image
+            else:
+                volume = np.empty(image.shape, dtype=np.uint8)
+                # One slice at a time to bound temporary float memory
+                for z in range(image.shape[0]):
+                    volume[z] = self.to_display_uint8(image[z])
+            self.display_volumes[self.image_mode] = volume
+        return self.display_volumes[self.image_mode]
+    
+    def slice_step(self, *dims):
+        """Stride that brings the longest side of a slice down to at most display_detail samples"""
+        # Round up so a side just under 2 * display_detail is still strided
+        return max(1, -(-max(dims) // self.display_detail))
+    
+    def get_slice_colors(self, plane, index, step=1):
+        """
+        Grayscale RGBA facecolors for a slice, looked up from the uint8 display volume
+        
+        In low-memory mode only the sampled slice is scaled to uint8 and no
+        display volume is kept.
+        
+        The slice is sampled every `step` voxels along both axes. The result
+        is kept per plane and reused until the image mode, slice index or
+        step changes, so redraws that leave a slice in place skip the
+        normalization and colormap lookup.
+        """
+        key = (self.image_mode, index, step)
+        cached = self.slice_color_cache.get(plane)
+        if cached is None or cached[0] != key:
+            volume = self.current_image if self.low_memory else self.get_display_volume()
+            if plane == 'coronal':
+                slice_data = volume[index, ::step, ::step]
+            elif plane == 'sagittal':
+                slice_data = volume[::step, ::step, index]
+            else:
+                slice_data = volume[::step, index, ::step]
+            if self.low_memory:
+                slice_data = self.to_display_uint8(slice_data)
+            cached = (key, self.gray_lut[slice_data])
+            self.slice_color_cache[plane] = cached
+        return cached[1]
+    
+    def slice_edges(self, n, step):
+        """Cell edges, in voxel coordinates, for `n` voxels sampled every `step` voxels"""
+        count = -(-n // step)
+        return np.minimum(np.arange(count + 1) * step, n).astype(np.float32) - 0.5
+    
+    def get_slice_verts(self, plane, index, step):
+        """
+        Quad vertices (cells, 4, 3) in (x, y, z) order for a strided slice plane
+        
+        One quad per sampled voxel, in the same row-major order as the
+        facecolors from get_slice_colors. The mesh is built once per plane
+        and step; later calls only move it to the new slice index.
+        """
+        # Axes of the (x, y, z) vertex coordinates spanned by slice rows and
+        # columns, and the axis held constant
+        if plane == 'coronal':
+            row_axis, col_axis, const_axis = 1, 0, 2
+        elif plane == 'sagittal':
+            row_axis, col_axis, const_axis = 2, 1, 0
+        else:
+            row_axis, col_axis, const_axis = 2, 0, 1
+        
+        cached = self.slice_verts.get(plane)
+        if cached is None or cached[0] != step:
+            sizes = (self.nx, self.ny, self.nz)
+            rows = self.slice_edges(sizes[row_axis], step)
+            cols = self.slice_edges(sizes[col_axis], step)
+            verts = np.empty((len(rows) - 1, len(cols) - 1, 4, 3), dtype=np.float32)
+            # Corners go round each cell: (r0, c0), (r0, c1), (r1, c1), (r1, c0)
+            for corner, (row_edges, col_edges) in enumerate([(rows[:-1], cols[:-1]), (rows[:-1], cols[1:]),
+                                                             (rows[1:], cols[1:]), (rows[1:], cols[:-1])]):
+                verts[:, :, corner, row_axis] = row_edges[:, np.newaxis]
+                verts[:, :, corner, col_axis] = col_edges[np.newaxis, :]
+            cached = (step, verts.reshape(-1, 4, 3))
+            self.slice_verts[plane] = cached
+        
+        verts = cached[1]
+        verts[:, :, const_axis] = index
+        return verts
+    
+    def draw_slice_mesh(self, plane, index, step):
+        """Show a slice plane as one quad mesh, reusing the plane's collection when it exists"""
+        artist = self.slice_artists.get(plane)
+        if not self.show_slice[plane]:
+            if artist is not None:
+                artist.set_visible(False)
+            return
+        
+        verts = self.get_slice_verts(plane, index, step)
+        colors = self.get_slice_colors(plane, index, step).reshape(-1, 4)
+        if artist is None:
+            artist = Poly3DCollection(verts, facecolors=colors, edgecolors='none',
+                                      alpha=self.slice_alpha, zorder=1)
+            self.ax_3d.add_collection3d(artist)
+            self.slice_artists[plane] = artist
+        else:
+            artist.set_verts(verts)
+            artist.set_facecolor(colors)
+            artist.set_alpha(self.slice_alpha)
+            artist.set_visible(True)
     
     def update_slice_coronal(self, slice_z):
         """Update coronal slice (constant Z) - front view, shows XY plane"""
-        if 'coronal' in self.slice_artists:
-            try:
-                self.slice_artists['coronal'].remove()
-            except:
-                pass
-            del self.slice_artists['coronal']
-        
-        if self.show_slice['coronal']:
-            # Coronal slice: constant Z (dorsal-ventral position)
-            # Shows X (left-right) vs Y (anterior-posterior) plane
-            # This is like looking at the brain from the FRONT
-            slice_data = self.current_image[slice_z, :, :]
-            
-            # Normalize for display
-            slice_norm = slice_data.astype(float) / (slice_data.max() + 1e-8)
-            
-            # Create meshgrid: X and Y vary, Z is constant
-            xx, yy = np.meshgrid(range(self.nx), range(self.ny))
-            zz = np.full_like(xx, slice_z, dtype=float)
-            
-            # Plot slice
-            surf = self.ax_3d.plot_surface(xx, yy, zz, 
-                                          facecolors=plt.cm.gray(slice_norm),
-                                          alpha=self.slice_alpha,
-                                          shade=False,
-                                          zorder=1)
-            self.slice_artists['coronal'] = surf
+        # Coronal slice: constant Z (dorsal-ventral position)
+        # Shows X (left-right) vs Y (anterior-posterior) plane
+        # This is like looking at the brain from the FRONT
+        self.draw_slice_mesh('coronal', slice_z, self.slice_step(self.ny, self.nx))
     
     def update_slice_sagittal(self, slice_x):
         """Update sagittal slice (constant X) - side view, shows YZ plane"""
-        if 'sagittal' in self.slice_artists:
-            try:
-                self.slice_artists['sagittal'].remove()
-            except:
-                pass
-            del self.slice_artists['sagittal']
-        
-        if self.show_slice['sagittal']:
-            # Sagittal slice: constant X (left-right position)
-            # Shows Y (anterior-posterior) vs Z (dorsal-ventral) plane
-            # This is like looking at the brain from the SIDE
-            slice_data = self.current_image[:, :, slice_x]
-            
-            # Normalize for display
-            slice_norm = slice_data.astype(float) / (slice_data.max() + 1e-8)
-            
-            # Create meshgrid: Y and Z vary, X is constant
-            yy, zz = np.meshgrid(range(self.ny), range(self.nz))
-            xx = np.full_like(yy, slice_x, dtype=float)
-            
-            # Plot slice
-            surf = self.ax_3d.plot_surface(xx, yy, zz,
-                                          facecolors=plt.cm.gray(slice_norm),
-                                          alpha=self.slice_alpha,
-                                          shade=False,
-                                          zorder=1)
-            self.slice_artists['sagittal'] = surf
+        # Sagittal slice: constant X (left-right position)
+        # Shows Y (anterior-posterior) vs Z (dorsal-ventral) plane
+        # This is like looking at the brain from the SIDE
+        self.draw_slice_mesh('sagittal', slice_x, self.slice_step(self.nz, self.ny))
     
     def update_slice_axial(self, slice_y):
         """Update axial slice (constant Y) - top view, shows XZ plane"""
-        if 'axial' in self.slice_artists:
-            try:
-                self.slice_artists['axial'].remove()
-            except:
-                pass
-            del self.slice_artists['axial']
+        # Axial slice: constant Y (anterior-posterior position)
+        # Shows X (left-right) vs Z (dorsal-ventral) plane
+        # This is like looking at the brain from the TOP
+        self.draw_slice_mesh('axial', slice_y, self.slice_step(self.nz, self.nx))
+    
+    def update_slice(self, plane):
+        """Redraw one slice plane at its current position"""
+        if plane == 'coronal':
+            self.update_slice_coronal(self.slice_z)   # Coronal uses Z
+        elif plane == 'sagittal':
+            self.update_slice_sagittal(self.slice_x)  # Sagittal uses X
+        else:
+            self.update_slice_axial(self.slice_y)     # Axial uses Y
+    
+    def apply_zoom(self):
+        """Set the axis limits for the current zoom level"""
+        center_x = self.nx / 2
+        center_y = self.ny / 2
+        center_z = self.nz / 2
         
-        if self.show_slice['axial']:
-            # Axial slice: constant Y (anterior-posterior position)
-            # Shows X (left-right) vs Z (dorsal-ventral) plane
-            # This is like looking at the brain from the TOP
-            slice_data = self.current_image[:, slice_y, :]
-            
-            # Normalize for display
-            slice_norm = slice_data.astype(float) / (slice_data.max() + 1e-8)
-            
-            # Create meshgrid: X and Z vary, Y is constant
-            xx, zz = np.meshgrid(range(self.nx), range(self.nz))
-            yy = np.full_like(xx, slice_y, dtype=float)
-            
-            # Plot slice
-            surf = self.ax_3d.plot_surface(xx, yy, zz,
-                                          facecolors=plt.cm.gray(slice_norm),
-                                          alpha=self.slice_alpha,
-                                          shade=False,
-                                          zorder=1)
-            self.slice_artists['axial'] = surf
+        range_x = self.nx / (2 * self.zoom_level)
+        range_y = self.ny / (2 * self.zoom_level)
+        range_z = self.nz / (2 * self.zoom_level)
+        
+        self.ax_3d.set_xlim(center_x - range_x, center_x + range_x)
+        self.ax_3d.set_ylim(center_y - range_y, center_y + range_y)
+        self.ax_3d.set_zlim(center_z - range_z, center_z + range_z)
+    
+    def update_title(self):
+        """Update title with visible fiber count and zoom"""
+        visible_count = int(self.fiber_visible.sum())
+        self.ax_3d.set_title(f'3D Fiber Visualization ({visible_count}/{len(self.fibers)} fibers visible) - Zoom: {self.zoom_level:.1f}x',
+                            fontsize=12, fontweight='bold', pad=20)
+    
+    def refresh_slice(self, plane):
+        """Redraw a single slice plane; fibers and the other slices are left as they are"""
+        self.update_slice(plane)
+        self.fig.canvas.draw_idle()
+    
+    def schedule_slice_refresh(self, plane):
+        """Queue a slice redraw and restart the debounce timer, so a drag only draws its last position"""
+        self.pending_slices.add(plane)
+        self.slice_timer.stop()
+        self.slice_timer.start()
+    
+    def flush_pending_slices(self):
+        """Redraw the slice planes queued by the sliders"""
+        for plane in self.pending_slices:
+            self.update_slice(plane)
+        self.pending_slices.clear()
+        self.fig.canvas.draw_idle()
+    
+    def refresh_fibers(self):
+        """Redraw the fibers after a visibility change; slices are left as they are"""
+        self.draw_fibers_3d()
+        self.update_title()
+        self.fig.canvas.draw_idle()
+    
+    def refresh_zoom(self):
+        """Apply a zoom change through the axis limits only, without rebuilding artists"""
+        self.apply_zoom()
+        self.update_title()
+        self.fig.canvas.draw_idle()
     
     def update_display(self):
         """Update the entire 3D display"""
@@ -269,28 +410,10 @@ class FiberVisualizer3D:
         elev = self.ax_3d.elev
         azim = self.ax_3d.azim
         
-        # Clear axis content but keep the axis
-        for artist in self.ax_3d.lines + self.ax_3d.collections:
-            try:
-                artist.remove()
-            except:
-                pass
-        
-        # Clear slice artists
-        for key in list(self.slice_artists.keys()):
-            try:
-                self.slice_artists[key].remove()
-            except:
-                pass
-        self.slice_artists.clear()
-        
-        # Redraw fibers
+        # Redraw fibers and every slice plane
         self.draw_fibers_3d()
-        
-        # Update slices - NOW CORRECT
-        self.update_slice_coronal(self.slice_z)  # Coronal uses Z
-        self.update_slice_sagittal(self.slice_x)  # Sagittal uses X
-        self.update_slice_axial(self.slice_y)     # Axial uses Y
+        for plane in self.show_slice:
+            self.update_slice(plane)
         
         # Set labels and limits with CORRECTED axes
         self.ax_3d.set_xlabel('X (Left-Right)', fontsize=10)
@@ -298,17 +421,7 @@ class FiberVisualizer3D:
         self.ax_3d.set_zlabel('Z (Dorsal-Ventral)', fontsize=10)
         
         # Apply zoom by adjusting axis limits
-        center_x = self.nx / 2
-        center_y = self.ny / 2
-        center_z = self.nz / 2
-        
-        range_x = self.nx / (2 * self.zoom_level)
-        range_y = self.ny / (2 * self.zoom_level)
-        range_z = self.nz / (2 * self.zoom_level)
-        
-        self.ax_3d.set_xlim(center_x - range_x, center_x + range_x)
-        self.ax_3d.set_ylim(center_y - range_y, center_y + range_y)
-        self.ax_3d.set_zlim(center_z - range_z, center_z + range_z)
+        self.apply_zoom()
         
         # Set aspect ratio to show proper proportions
         # This makes the brain look anatomically correct
@@ -317,11 +430,7 @@ class FiberVisualizer3D:
         # Restore view
         self.ax_3d.view_init(elev=elev, azim=azim)
         
-        # Update title with visible fiber count and zoom
-        visible_count = sum(1 for f in self.fibers if f['visible'])
-        self.ax_3d.set_title(f'3D Fiber Visualization ({visible_count}/{len(self.fibers)} fibers visible) - Zoom: {self.zoom_level:.1f}x',
-                            fontsize=12, fontweight='bold', pad=20)
-        
+        self.update_title()
         self.fig.canvas.draw_idle()
     
     def start(self):
@@ -347,6 +456,11 @@ class FiberVisualizer3D:
         # 3D visualization (left side - larger)
         self.ax_3d = self.fig.add_subplot(121, projection='3d')
         
+        # Slider events within 30 ms of each other collapse into one redraw
+        self.slice_timer = self.fig.canvas.new_timer(interval=30)
+        self.slice_timer.single_shot = True
+        self.slice_timer.add_callback(self.flush_pending_slices)
+        
         # Initial draw
         self.draw_fibers_3d()
         self.update_slice_coronal(self.slice_z)  # FIXED: Coronal uses Z
@@ -374,10 +488,31 @@ class FiberVisualizer3D:
                     # Zoom out
                     self.zoom_level = max(self.zoom_level / 1.1, 0.5)  # Min 0.5x zoom
                 
-                self.update_display()
+                self.refresh_zoom()
         
         self.fig.canvas.mpl_connect('scroll_event', on_scroll)
         
+        # Hide the slice meshes while the view is dragged so rotation only
+        # redraws the fibers; they come back when the mouse is released
+        self.rotating = False
+        
+        def on_press(event):
+            if event.inaxes == self.ax_3d:
+                self.rotating = True
+                for artist in self.slice_artists.values():
+                    artist.set_visible(False)
+                self.fig.canvas.draw_idle()
+        
+        def on_release(event):
+            if self.rotating:
+                self.rotating = False
+                for plane, artist in self.slice_artists.items():
+                    artist.set_visible(self.show_slice[plane])
+                self.fig.canvas.draw_idle()
+        
+        self.fig.canvas.mpl_connect('button_press_event', on_press)
+        self.fig.canvas.mpl_connect('button_release_event', on_release)
+        
         # Control panel (right side)
         # Image mode selector (microCT vs CCF)
         if self.ccf_image is not None:
@@ -391,7 +526,10 @@ class FiberVisualizer3D:
                 else:
                     self.current_image = self.microct_image
                     self.image_mode = 'microct'
-                self.update_display()
+                # Fibers don't depend on the image; only the slices change
+                for plane in self.show_slice:
+                    self.update_slice(plane)
+                self.fig.canvas.draw_idle()
             
             radio.on_clicked(change_image_mode)
         
@@ -409,15 +547,15 @@ class FiberVisualizer3D:
         
         def update_z(val):
             self.slice_z = int(val)
-            self.update_display()
+            self.schedule_slice_refresh('coronal')
         
         def update_x(val):
             self.slice_x = int(val)
-            self.update_display()
+            self.schedule_slice_refresh('sagittal')
         
         def update_y(val):
             self.slice_y = int(val)
-            self.update_display()
+            self.schedule_slice_refresh('axial')
         
         self.slider_z.on_changed(update_z)
         self.slider_x.on_changed(update_x)
@@ -438,17 +576,17 @@ class FiberVisualizer3D:
         def toggle_coronal(event):
             self.show_slice['coronal'] = not self.show_slice['coronal']
             btn_coronal.color = 'lightgreen' if self.show_slice['coronal'] else 'lightgray'
-            self.update_display()
+            self.refresh_slice('coronal')
         
         def toggle_sagittal(event):
             self.show_slice['sagittal'] = not self.show_slice['sagittal']
             btn_sagittal.color = 'lightgreen' if self.show_slice['sagittal'] else 'lightgray'
-            self.update_display()
+            self.refresh_slice('sagittal')
         
         def toggle_axial(event):
             self.show_slice['axial'] = not self.show_slice['axial']
             btn_axial.color = 'lightgreen' if self.show_slice['axial'] else 'lightgray'
-            self.update_display()
+            self.refresh_slice('axial')
         
         btn_coronal.on_clicked(toggle_coronal)
         btn_sagittal.on_clicked(toggle_sagittal)
@@ -478,16 +616,14 @@ class FiberVisualizer3D:
             check_ax.axis('off')
             
             checks = CheckButtons(check_ax, fiber_labels, 
-                                 [f['visible'] for f in self.fibers])
+                                 self.fiber_visible.tolist())
             
             def toggle_fiber(label):
                 # Find fiber index from label
                 fiber_id = int(label.split(':')[0].replace('F', ''))
-                for fiber in self.fibers:
-                    if fiber['id'] == fiber_id:
-                        fiber['visible'] = not fiber['visible']
-                        break
-                self.update_display()
+                i = self.fiber_index[fiber_id]
+                self.fiber_visible[i] = not self.fiber_visible[i]
+                self.refresh_fibers()
             
             checks.on_clicked(toggle_fiber)
             
@@ -498,20 +634,18 @@ class FiberVisualizer3D:
             check_ax1 = plt.axes([0.60, 0.12, 0.17, 0.50])
             check_ax1.axis('off')
             checks1 = CheckButtons(check_ax1, fiber_labels[:mid],
-                                  [f['visible'] for f in self.fibers[:mid]])
+                                  self.fiber_visible[:mid].tolist())
             
             check_ax2 = plt.axes([0.78, 0.12, 0.17, 0.50])
             check_ax2.axis('off')
             checks2 = CheckButtons(check_ax2, fiber_labels[mid:],
-                                  [f['visible'] for f in self.fibers[mid:]])
+                                  self.fiber_visible[mid:].tolist())
             
             def toggle_fiber(label):
                 fiber_id = int(label.split(':')[0].replace('F', ''))
-                for fiber in self.fibers:
-                    if fiber['id'] == fiber_id:
-                        fiber['visible'] = not fiber['visible']
-                        break
-                self.update_display()
+                i = self.fiber_index[fiber_id]
+                self.fiber_visible[i] = not self.fiber_visible[i]
+                self.refresh_fibers()
             
             checks1.on_clicked(toggle_fiber)
             checks2.on_clicked(toggle_fiber)
@@ -554,7 +688,7 @@ class FiberVisualizer3D:
         
         def reset_zoom(event):
             self.zoom_level = 1.0
-            self.update_display()
+            self.refresh_zoom()
         
         btn_zoom_reset.on_clicked(reset_zoom)
         
@@ -606,10 +740,12 @@ def main():
         return
     
     # Create visualizer
+    # Set low_memory=True for volumes too large to keep a uint8 copy in RAM
     visualizer = FiberVisualizer3D(
         image_path=str(image_path),
         fiber_data_path=str(fiber_data_path),
-        ccf_path=str(ccf_path) if ccf_path else None
+        ccf_path=str(ccf_path) if ccf_path else None,
+        low_memory=False
     )
     
     # Start interactive session
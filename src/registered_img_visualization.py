@@ -7,6 +7,12 @@ import tifffile
 import nrrd
 import matplotlib.pyplot as plt
 
+try:
+    # orjson parses the large Allen structure tree several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 def select_registered_tif():
     """Open file dialog to select registered .tif file"""
     root = Tk()
@@ -32,8 +38,8 @@ def load_structure_tree(ccf_path):
     """Load and parse structure_tree.json to get region colors"""
     json_path = os.path.join(ccf_path, "structure_tree.json")
     
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    with open(json_path, 'rb') as f:
+        data = json_loads(f.read())
     
     # Create mapping: annotation_id -> RGB color
     color_map = {}